@@ -3,6 +3,7 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 
 from accounts.models import Profile
+from common.thumbnails import generate_thumbnails_on_commit
 from common.utils import is_too_long_word_in_text
 
 SAME_EMAIL_ERROR = "An account with the same email already exists!"
@@ -43,3 +44,9 @@ class ProfileForm(forms.ModelForm):
         if is_too_long_word_in_text(description):
             raise forms.ValidationError(TOO_LONG_WORD_ERROR)
         return description
+
+    def save(self, commit=True):
+        profile = super().save(commit)
+        if commit and "photo" in self.changed_data:
+            generate_thumbnails_on_commit([profile.photo])
+        return profile
@@ -1,12 +1,17 @@
+from unittest import mock
+
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.urls import reverse
 
 from accounts.forms import SAME_EMAIL_ERROR, TOO_LONG_WORD_ERROR
 from accounts.models import Profile
-from accounts.views import (ACCOUNT_CREATE_SUCCESS_MESSAGE,
-                            PROFILE_UPDATE_SUCCESS_MESSAGE)
+from accounts.views import (
+    ACCOUNT_CREATE_SUCCESS_MESSAGE,
+    PROFILE_UPDATE_SUCCESS_MESSAGE,
+)
 from quizzes.models import Category, Quiz
+from quizzes.tests.test_thumbnails import ThumbnailsTestMixin, create_image_file
 
 
 class TestRegisterView(TestCase):
@@ -85,7 +90,7 @@ class TestRegisterView(TestCase):
                 self.assertContains(response, expected_message)
 
 
-class TestProfileView(TestCase):
+class TestProfileView(ThumbnailsTestMixin, TestCase):
     profile_url = reverse("accounts:profile")
     login_url = reverse("accounts:login")
 
@@ -97,6 +102,7 @@ class TestProfileView(TestCase):
         )
 
     def setUp(self):
+        super().setUp()
         self.client.login(username="User123", password="SecretPass123")
 
     def test_redirects_to_login_page_when_user_is_not_logged(self):
@@ -140,3 +146,18 @@ class TestProfileView(TestCase):
             follow=True,
         )
         self.assertContains(response, TOO_LONG_WORD_ERROR)
+
+    @mock.patch("accounts.forms.generate_thumbnails_on_commit")
+    def test_generates_thumbnails_of_uploaded_photo(self, generate):
+        self.client.post(
+            self.profile_url,
+            data={"description": "", "photo": create_image_file("photo.jpg")},
+        )
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.photo.name, "profile_photos/photo.jpg")
+        generate.assert_called_once_with([profile.photo])
+
+    @mock.patch("accounts.forms.generate_thumbnails_on_commit")
+    def test_does_not_generate_thumbnails_when_photo_is_not_changed(self, generate):
+        self.client.post(self.profile_url, data={"description": "New Description"})
+        generate.assert_not_called()
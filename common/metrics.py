@@ -0,0 +1,331 @@
+import atexit
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+from django.template.backends.django import reraise
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "request-metrics"
+VIEW_NAMES_KEY = f"{METRICS_KEY_PREFIX}-views"
+LOCK_KEY = f"{METRICS_KEY_PREFIX}-lock"
+LOCK_TIMEOUT = 10
+UNRESOLVED_VIEW_NAME = "<unresolved>"
+MAX_N_PLUS_ONE_SHAPES = 10
+
+current_request_metrics = contextvars.ContextVar(
+    "current_request_metrics", default=None
+)
+
+TIME_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500]
+METRIC_BUCKETS = {
+    "total_ms": TIME_BUCKETS,
+    "view_ms": TIME_BUCKETS,
+    "db_ms": TIME_BUCKETS,
+    "template_ms": TIME_BUCKETS,
+    "queries": QUERY_BUCKETS,
+}
+
+
+def get_sql_shape(sql):
+    # Queries differing only in the length of an IN list have the same shape.
+    return re.sub(r"\(%s(?:, %s)+\)", "(%s, ...)", sql)
+
+
+def get_view_key(view_name):
+    return f"{METRICS_KEY_PREFIX}-view-{view_name}"
+
+
+@contextmanager
+def metrics_lock():
+    while not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def get_bucket(value, bounds):
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def get_empty_view_metrics():
+    return {
+        "requests": 0,
+        "n_plus_one_requests": 0,
+        "n_plus_one_shapes": {},
+        "metrics": {
+            name: {"sum": 0, "buckets": [0] * (len(bounds) + 1)}
+            for name, bounds in METRIC_BUCKETS.items()
+        },
+    }
+
+
+def add_request(view_metrics, values, n_plus_one_shapes):
+    view_metrics["requests"] += 1
+    for name, value in values.items():
+        metric = view_metrics["metrics"][name]
+        metric["sum"] += value
+        metric["buckets"][get_bucket(value, METRIC_BUCKETS[name])] += 1
+    if n_plus_one_shapes:
+        view_metrics["n_plus_one_requests"] += 1
+        add_n_plus_one_shapes(view_metrics, n_plus_one_shapes)
+
+
+def add_n_plus_one_shapes(view_metrics, n_plus_one_shapes):
+    shapes = Counter(view_metrics["n_plus_one_shapes"])
+    shapes.update(n_plus_one_shapes)
+    view_metrics["n_plus_one_shapes"] = dict(shapes.most_common(MAX_N_PLUS_ONE_SHAPES))
+
+
+def merge_view_metrics(view_metrics, other):
+    view_metrics["requests"] += other["requests"]
+    view_metrics["n_plus_one_requests"] += other["n_plus_one_requests"]
+    add_n_plus_one_shapes(view_metrics, other["n_plus_one_shapes"])
+    for name, other_metric in other["metrics"].items():
+        metric = view_metrics["metrics"][name]
+        metric["sum"] += other_metric["sum"]
+        metric["buckets"] = [
+            count + other_count
+            for count, other_count in zip(metric["buckets"], other_metric["buckets"])
+        ]
+
+
+class MetricsBuffer:
+    # Requests are aggregated in the process and merged into the cache at most
+    # once per flush interval, so only the flushes take the cache lock.
+    def __init__(self):
+        self.views = {}
+        self.lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+
+    def add(self, view_name, values, n_plus_one_shapes):
+        with self.lock:
+            view_metrics = self.views.get(view_name)
+            if view_metrics is None:
+                view_metrics = self.views[view_name] = get_empty_view_metrics()
+            add_request(view_metrics, values, n_plus_one_shapes)
+            is_due = (
+                time.monotonic() - self.flushed_at
+                >= settings.REQUEST_METRICS_FLUSH_INTERVAL
+            )
+        if is_due:
+            self.flush()
+
+    def discard(self):
+        with self.lock:
+            self.views = {}
+            self.flushed_at = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            views, self.views = self.views, {}
+            self.flushed_at = time.monotonic()
+        if not views:
+            return
+
+        with metrics_lock():
+            view_names = cache.get(VIEW_NAMES_KEY, set())
+            if not view_names.issuperset(views):
+                cache.set(VIEW_NAMES_KEY, view_names | views.keys(), None)
+
+            keys = {get_view_key(view_name): view_name for view_name in views}
+            cached = cache.get_many(keys.keys())
+            for key, view_name in keys.items():
+                view_metrics = cached.get(key) or get_empty_view_metrics()
+                merge_view_metrics(view_metrics, views[view_name])
+                cached[key] = view_metrics
+            cache.set_many(cached, None)
+
+
+_metrics_buffer = None
+_metrics_buffer_lock = threading.Lock()
+
+
+def get_metrics_buffer():
+    global _metrics_buffer
+    with _metrics_buffer_lock:
+        if _metrics_buffer is None:
+            _metrics_buffer = MetricsBuffer()
+            atexit.register(_metrics_buffer.flush)
+    return _metrics_buffer
+
+
+def record_request_metrics(view_name, values, n_plus_one_shapes):
+    get_metrics_buffer().add(view_name, values, n_plus_one_shapes)
+
+
+def get_request_metrics():
+    get_metrics_buffer().flush()
+    view_names = cache.get(VIEW_NAMES_KEY, set())
+    keys = {get_view_key(view_name): view_name for view_name in view_names}
+    return {
+        keys[key]: view_metrics
+        for key, view_metrics in cache.get_many(keys.keys()).items()
+    }
+
+
+def reset_request_metrics():
+    get_metrics_buffer().discard()
+    with metrics_lock():
+        view_names = cache.get(VIEW_NAMES_KEY, set())
+        cache.delete_many([get_view_key(view_name) for view_name in view_names])
+        cache.delete(VIEW_NAMES_KEY)
+
+
+def get_percentile_bound(buckets, bounds, p):
+    # The upper bound of the bucket holding the percentile, None if it is
+    # above the last bound.
+    target = sum(buckets) * p / 100
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if count and seen >= target:
+            return bounds[i] if i < len(bounds) else None
+    return 0
+
+
+def get_request_metrics_summary():
+    summary = {}
+    for view_name, view_metrics in sorted(get_request_metrics().items()):
+        requests = view_metrics["requests"]
+        summary[view_name] = {
+            "requests": requests,
+            "n_plus_one_requests": view_metrics["n_plus_one_requests"],
+            "n_plus_one_shapes": view_metrics["n_plus_one_shapes"],
+            "metrics": {
+                name: {
+                    "mean": round(metric["sum"] / requests, 3),
+                    "p50": get_percentile_bound(
+                        metric["buckets"], METRIC_BUCKETS[name], 50
+                    ),
+                    "p95": get_percentile_bound(
+                        metric["buckets"], METRIC_BUCKETS[name], 95
+                    ),
+                    "bounds": METRIC_BUCKETS[name],
+                    "buckets": metric["buckets"],
+                }
+                for name, metric in view_metrics["metrics"].items()
+            },
+        }
+    return summary
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0
+        self.template_time = 0
+        self.rendering_templates = 0
+        self.sql_shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.sql_shapes[get_sql_shape(sql)] += 1
+
+    @contextmanager
+    def time_template(self):
+        # Templates rendered by another template, e.g. with render_to_string
+        # in a template tag, are already a part of its time.
+        self.rendering_templates += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.rendering_templates -= 1
+            if not self.rendering_templates:
+                self.template_time += time.perf_counter() - start
+
+    def get_n_plus_one_shapes(self, threshold):
+        return {
+            shape: count
+            for shape, count in self.sql_shapes.items()
+            if count >= threshold
+        }
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        start = time.perf_counter()
+        token = current_request_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        total_time = time.perf_counter() - start
+
+        view_name = UNRESOLVED_VIEW_NAME
+        if request.resolver_match:
+            view_name = request.resolver_match.view_name
+        n_plus_one_shapes = metrics.get_n_plus_one_shapes(
+            settings.REQUEST_METRICS_N_PLUS_ONE_THRESHOLD
+        )
+        for shape, count in n_plus_one_shapes.items():
+            logger.warning("Possible N+1 in %s, %d times: %s", view_name, count, shape)
+
+        record_request_metrics(
+            view_name,
+            {
+                "total_ms": total_time * 1000,
+                "view_ms": (total_time - metrics.template_time) * 1000,
+                "db_ms": metrics.db_time * 1000,
+                "template_ms": metrics.template_time * 1000,
+                "queries": metrics.queries,
+            },
+            n_plus_one_shapes,
+        )
+        return response
+
+
+class TimedTemplate(DjangoTemplate):
+    def render(self, context=None, request=None):
+        metrics = current_request_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        with metrics.time_template():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    # Every template rendered during a request, not only the ones of template
+    # responses, is counted in its template time.
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,117 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor, cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return bool(self.cursor)
+
+
+class CursorPaginator:
+    def __init__(self, queryset, per_page, key="pk", asc=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key = key
+        self.asc = asc
+
+    def page(self, cursor):
+        qs = self.queryset.order_by(*self.get_ordering())
+        if cursor:
+            try:
+                qs = qs.filter(self.get_cursor_filter(*self.decode_cursor(cursor)))
+                object_list = list(qs[: self.per_page + 1])
+            except (TypeError, ValueError, OverflowError, ValidationError):
+                # A cursor which passes the checks of decode_cursor can still
+                # be rejected by the database, e.g. with a too big number.
+                raise InvalidCursor(cursor)
+        else:
+            object_list = list(qs[: self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[: self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return CursorPage(object_list, next_cursor, cursor)
+
+    def get_ordering(self):
+        ordering = [self.key] if self.key == "pk" else [self.key, "pk"]
+        return ordering if self.asc else [f"-{field}" for field in ordering]
+
+    def get_cursor_filter(self, value, pk):
+        lookup = "gt" if self.asc else "lt"
+        if self.key == "pk":
+            return Q(**{f"pk__{lookup}": pk})
+        return Q(**{f"{self.key}__{lookup}": value}) | Q(
+            **{self.key: value, f"pk__{lookup}": pk}
+        )
+
+    def get_key_value(self, obj):
+        value = obj
+        for attr in self.key.split("__"):
+            value = getattr(value, attr)
+        return value
+
+    def encode_cursor(self, obj):
+        value = self.get_key_value(obj)
+        if isinstance(value, datetime):
+            # DjangoJSONEncoder cuts datetimes to milliseconds, which would
+            # skip rows differing only in microseconds.
+            value = value.isoformat()
+        data = json.dumps([value, obj.pk], cls=DjangoJSONEncoder)
+        return urlsafe_b64encode(data.encode()).decode()
+
+    def get_key_field(self):
+        model = self.queryset.model
+        field = None
+        for name in self.key.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model
+        return field
+
+    def decode_cursor(self, cursor):
+        try:
+            data = json.loads(urlsafe_b64decode(cursor.encode()))
+        except (BinasciiError, UnicodeError, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        if not isinstance(data, list) or len(data) != 2:
+            raise InvalidCursor(cursor)
+
+        value, pk = data
+        if not isinstance(pk, int) or isinstance(pk, bool):
+            raise InvalidCursor(cursor)
+        if self.key == "pk":
+            return None, pk
+        # The value has to match the ordering field, so a cursor of another
+        # sorting is rejected instead of being compared with the wrong column.
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise InvalidCursor(cursor)
+        try:
+            value = self.get_key_field().to_python(value)
+        except (TypeError, ValueError, ValidationError):
+            raise InvalidCursor(cursor)
+        if value is None:
+            raise InvalidCursor(cursor)
+        return value, pk
@@ -0,0 +1,10 @@
+import django
+from django.db import connections
+
+
+def init_worker():
+    # This module imports no models, so spawned processes can unpickle the
+    # initializer before the app registry is ready.
+    django.setup()
+    # Workers must not share the database connections of the parent process.
+    connections.close_all()
@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import ThumbnailFile, get_thumbnailer
+
+from common.processes import init_worker
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = create_executor(settings.THUMBNAIL_WORKERS)
+    return _executor
+
+
+def create_executor(workers):
+    # Workers only resize the images, the thumbnails are saved by the calling
+    # process. The pool is created from threaded web workers, so its processes
+    # are spawned rather than forked with the locks held by other threads.
+    return ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+
+
+def get_missing_thumbnails(fieldfile, force=False):
+    thumbnailer = get_thumbnailer(fieldfile)
+    missing = []
+    for alias, options in aliases.all(fieldfile).items():
+        options = {**options, "ALIAS": alias}
+        if force or thumbnailer.get_existing_thumbnail(options) is None:
+            missing.append(options)
+    return missing
+
+
+def render_thumbnails(storage, name, thumbnail_options):
+    thumbnailer = get_thumbnailer(storage, name)
+    thumbnails = []
+    for options in thumbnail_options:
+        thumbnail = thumbnailer.generate_thumbnail(options)
+        thumbnails.append((thumbnail.name, thumbnail.file.read()))
+    return thumbnails
+
+
+def save_thumbnails(fieldfile, thumbnails):
+    thumbnailer = get_thumbnailer(fieldfile)
+    for name, content in thumbnails:
+        thumbnailer.save_thumbnail(
+            ThumbnailFile(
+                name, file=ContentFile(content), storage=thumbnailer.thumbnail_storage
+            )
+        )
+
+
+def generate_thumbnails(fieldfiles, executor=None, force=False):
+    executor = executor or get_executor()
+    futures = {}
+    submitted = set()
+    for fieldfile in fieldfiles:
+        if not fieldfile:
+            continue
+        # Default images are shared by many rows, but are resized only once.
+        key = (fieldfile.field, fieldfile.name)
+        if key in submitted:
+            continue
+        submitted.add(key)
+        missing = get_missing_thumbnails(fieldfile, force)
+        if missing:
+            future = executor.submit(
+                render_thumbnails, fieldfile.storage, fieldfile.name, missing
+            )
+            futures[future] = fieldfile
+
+    generated = 0
+    for future in as_completed(futures):
+        fieldfile = futures[future]
+        try:
+            thumbnails = future.result()
+        except Exception:
+            logger.exception("Could not generate thumbnails of %s", fieldfile.name)
+            continue
+        save_thumbnails(fieldfile, thumbnails)
+        generated += len(thumbnails)
+    return generated
+
+
+def _generate_thumbnails_in_thread(fieldfiles):
+    try:
+        generate_thumbnails(fieldfiles)
+    except Exception:
+        logger.exception("Could not generate thumbnails")
+    finally:
+        connection.close()
+
+
+def generate_thumbnails_on_commit(fieldfiles):
+    fieldfiles = [fieldfile for fieldfile in fieldfiles if fieldfile]
+    if not fieldfiles:
+        return
+
+    # The uploads are resized in the background, so the response does not
+    # wait for them. A thumbnail which is not ready yet is generated by the
+    # thumbnail_url filter, as before.
+    def start_thread():
+        threading.Thread(
+            target=_generate_thumbnails_in_thread, args=(fieldfiles,), daemon=True
+        ).start()
+
+    transaction.on_commit(start_thread)
+
+
+def get_thumbnail_url_cache_key(fieldfile, alias):
+    # Uploads never overwrite an existing file, so a replaced image has a new
+    # name and gets a new entry. The alias options are a part of the key, so
+    # resizing an alias does not serve the URLs of the old size.
+    options = aliases.get(alias, target=fieldfile) or {}
+    # easy_thumbnails adds the alias name to the options when it resolves them.
+    options = sorted((key, value) for key, value in options.items() if key != "ALIAS")
+    source = f"{fieldfile.name}:{alias}:{options}"
+    if fieldfile.name == fieldfile.field.default:
+        # Default images are replaced in place by the operators, so only
+        # their modification time tells the versions apart.
+        try:
+            modified = fieldfile.storage.get_modified_time(fieldfile.name)
+        except OSError:
+            modified = None
+        source = f"{source}:{modified}"
+    return f"thumbnail-url-{hashlib.md5(source.encode()).hexdigest()}"
+
+
+def resolve_thumbnail_url(fieldfile, alias):
+    try:
+        return get_thumbnailer(fieldfile)[alias].url
+    except Exception:
+        return ""
+
+
+def prefetch_thumbnail_urls(fieldfiles, alias):
+    cache = caches[settings.THUMBNAIL_URL_CACHE]
+    keys = {}
+    keys_by_name = {}
+    for fieldfile in fieldfiles:
+        if not fieldfile:
+            continue
+        urls = vars(fieldfile).setdefault("thumbnail_urls", {})
+        if alias in urls:
+            continue
+        # Shared images, like the defaults, are keyed once per prefetch.
+        name = (fieldfile.field, fieldfile.name)
+        if name not in keys_by_name:
+            keys_by_name[name] = get_thumbnail_url_cache_key(fieldfile, alias)
+        keys.setdefault(keys_by_name[name], []).append(fieldfile)
+    if not keys:
+        return
+
+    cached_urls = cache.get_many(keys.keys())
+    missing_urls = {}
+    for key, key_fieldfiles in keys.items():
+        url = cached_urls.get(key)
+        if url is None:
+            url = resolve_thumbnail_url(key_fieldfiles[0], alias)
+            # URLs of missing or invalid sources are not cached, so they are
+            # resolved again once the source is fixed.
+            if url:
+                missing_urls[key] = url
+        for fieldfile in key_fieldfiles:
+            fieldfile.thumbnail_urls[alias] = url
+    if missing_urls:
+        cache.set_many(missing_urls, None)
+
+
+def get_thumbnail_url(fieldfile, alias):
+    if not fieldfile:
+        return ""
+    prefetch_thumbnail_urls([fieldfile], alias)
+    return fieldfile.thumbnail_urls[alias]
@@ -0,0 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from common.metrics import get_request_metrics_summary
+
+
+@staff_member_required
+def request_metrics_view(request):
+    return JsonResponse(get_request_metrics_summary())
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "common.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -57,7 +58,7 @@ ROOT_URLCONF = "quiz_app.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "common.metrics.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "common" / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -85,6 +86,17 @@ DATABASES = {
 }
 
 
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "thumbnails": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "thumbnails",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -131,13 +143,66 @@ MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
 
+# Aliases are defined per image field, so uploads are resized only to the
+# sizes in which they are displayed.
 THUMBNAIL_ALIASES = {
-    "": {
+    "accounts.Profile.photo": {
         "avatar": {"size": (70, 70), "crop": True},
         "avatar_thumbnail": {"size": (40, 40), "crop": True},
+    },
+    "quizzes.Quiz.thumbnail": {
         "quiz_thumbnail": {"size": (300, 170), "crop": True},
+    },
+    "quizzes.Question.image": {
         "question_image": {"size": (300, 170), "crop": True},
     },
 }
+# Thumbnails of uploaded images are generated after the upload is saved, in
+# a pool of worker processes.
+THUMBNAIL_WORKERS = 2
+# Thumbnail URLs are cached by the source image name and the alias options
+# in a separate cache, so they are evicted least recently used first without
+# pushing out the other entries.
+THUMBNAIL_URL_CACHE = "thumbnails"
+
+TOP_QUIZZES_NUMBER = 3
+TOP_QUIZZES_CACHE_TIMEOUT = 60 * 5
+
+# Likes are buffered in the cache and written to the database in batches,
+# so in production the cache has to be shared by all workers.
+LIKES_FLUSH_THRESHOLD = 100
+LIKES_FLUSH_INTERVAL = 60
+
+LEADERBOARD_SIZE = 10
+
+QUIZ_SEARCH_BACKEND = "quizzes.search.SQLiteSearchBackend"
+
+# Submit quizzes and likes to the async views, which save scores in background
+# threads. They are meant to be served by an ASGI server.
+ASYNC_QUIZ_SUBMISSION = False
+SCORE_WRITER_THREADS = 4
+
+# Buffer scores in each process and save them with bulk_create when the buffer
+# is full or after the interval (in seconds). Scores which have not been saved
+# yet are lost if the process is killed, so when every score has to be durable
+# keep it disabled, which saves each score in the request.
+SCORE_BUFFER_ENABLED = False
+SCORE_BUFFER_SIZE = 100
+SCORE_BUFFER_INTERVAL = 1.0
+
+# Queue score inserts, stats recomputations and like flushes as jobs in the
+# database. They are processed in batches by the run_jobs command.
+JOB_QUEUE_ENABLED = False
+JOB_QUEUE_BATCH_SIZE = 100
+JOB_QUEUE_LOCK_TIMEOUT = 300
+JOB_QUEUE_MAX_ATTEMPTS = 5
+JOB_QUEUE_RETRY_DELAY = 10
+
+# Request metrics are aggregated by every process and merged into the cache at
+# most every REQUEST_METRICS_FLUSH_INTERVAL seconds, so the request_metrics
+# command only sees the flushed requests of web workers sharing the cache.
+REQUEST_METRICS_ENABLED = False
+REQUEST_METRICS_FLUSH_INTERVAL = 10
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = 5
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -18,10 +18,12 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from common.views import request_metrics_view
 from quizzes.views import HomePageView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics/", request_metrics_view, name="request_metrics"),
     path("", HomePageView.as_view(), name="home"),
     path("accounts/", include("accounts.urls", namespace="accounts")),
     path("quizzes/", include("quizzes.urls", namespace="quizzes")),
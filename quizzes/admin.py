@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from quizzes.models import Answer, Category, Question, Quiz
+from quizzes.models import Answer, Category, Job, Question, Quiz, QuizStats
 
 
 @admin.register(Category)
@@ -21,3 +21,14 @@ class QuestionAdmin(admin.ModelAdmin):
 @admin.register(Answer)
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ["answer", "question", "is_correct"]
+
+
+@admin.register(QuizStats)
+class QuizStatsAdmin(admin.ModelAdmin):
+    list_display = ["quiz", "attempts", "average_score"]
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["name", "key", "attempts", "available_at", "failed_at"]
+    list_filter = ["name"]
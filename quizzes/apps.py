@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class QuizzesConfig(AppConfig):
     name = "quizzes"
+
+    def ready(self):
+        import quizzes.likes
+        import quizzes.scores
+        import quizzes.signals
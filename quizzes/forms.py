@@ -1,5 +1,6 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from django.forms import (
     BaseFormSet,
     BaseInlineFormSet,
@@ -7,8 +8,10 @@ from django.forms import (
     inlineformset_factory,
 )
 
+from common.thumbnails import generate_thumbnails_on_commit
 from common.utils import is_too_long_word_in_text
 from quizzes.models import Answer, Category, Question, Quiz
+from quizzes.search import get_search_backend
 
 SAME_QUIZ_TITLE_ERROR = "Quiz with the same title already exists!"
 ALL_ANSWERS_INCORRECT_ERROR = "At least one of the answers must be marked as correct!"
@@ -43,10 +46,55 @@ class QuizForm(forms.ModelForm):
             quiz.author = author
         if commit:
             quiz.save()
+            if "thumbnail" in self.changed_data:
+                generate_thumbnails_on_commit([quiz.thumbnail])
         return quiz
 
 
-class BaseAnswerFormSet(BaseInlineFormSet):
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    def __init__(self, objects, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.objects = {str(obj.pk): obj for obj in objects}
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.objects[str(value)]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages["invalid_choice"], code="invalid_choice"
+            )
+
+
+class PrefetchedInlineFormSetMixin:
+    def get_prefetched_objects(self):
+        related_name = self.fk.remote_field.get_accessor_name()
+        prefetched_objects = getattr(self.instance, "_prefetched_objects_cache", {})
+        return prefetched_objects.get(related_name)
+
+    def get_queryset(self):
+        prefetched_objects = self.get_prefetched_objects()
+        if prefetched_objects is not None:
+            return prefetched_objects
+        return super().get_queryset()
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        prefetched_objects = self.get_prefetched_objects()
+        if prefetched_objects is not None:
+            pk_name = self.model._meta.pk.name
+            pk_field = form.fields[pk_name]
+            form.fields[pk_name] = PrefetchedModelChoiceField(
+                prefetched_objects,
+                pk_field.queryset,
+                initial=pk_field.initial,
+                required=False,
+                widget=pk_field.widget,
+            )
+
+
+class BaseAnswerFormSet(PrefetchedInlineFormSetMixin, BaseInlineFormSet):
     def clean(self):
         if any(self.errors):
             return
@@ -73,7 +121,7 @@ AnswerFormSet = inlineformset_factory(
 )
 
 
-class BaseQuestionFormSet(BaseInlineFormSet):
+class BaseQuestionFormSet(PrefetchedInlineFormSetMixin, BaseInlineFormSet):
     def add_fields(self, form, index):
         super().add_fields(form, index)
         form.nested = AnswerFormSet(
@@ -112,15 +160,89 @@ class BaseQuestionFormSet(BaseInlineFormSet):
         if quiz:
             self.instance = quiz
 
-        result = super().save(commit=commit)
+        if not commit:
+            result = super().save(commit=False)
+            for form in self.forms:
+                if hasattr(form, "nested"):
+                    if not self._should_delete_form(form):
+                        form.nested.save(commit=False)
+            return result
 
-        for form in self.forms:
-            if hasattr(form, "nested"):
-                if not self._should_delete_form(form):
-                    form.nested.save(commit=commit)
+        with transaction.atomic():
+            result = self.bulk_save()
+
+        get_search_backend().index_quiz(
+            self.instance, Question.objects.filter(quiz=self.instance)
+        )
 
         return result
 
+    def bulk_save(self):
+        super().save(commit=False)
+
+        if self.deleted_objects:
+            Question.objects.filter(
+                pk__in=[question.pk for question in self.deleted_objects]
+            ).delete()
+        self.bulk_create_questions(self.new_objects)
+        if self.new_objects:
+            # bulk_create does not send post_save, so new questions are counted here
+            Quiz.objects.increment_counter(
+                "question_count", {self.instance.pk: len(self.new_objects)}
+            )
+        changed_questions = [question for question, _ in self.changed_objects]
+        image_field = Question._meta.get_field("image")
+        for question in changed_questions:
+            image_field.pre_save(question, add=False)
+        Question.objects.bulk_update(changed_questions, ["question", "image"])
+
+        new_answers = []
+        changed_answers = []
+        for form in self.forms:
+            if (
+                not hasattr(form, "nested")
+                or self._should_delete_form(form)
+                or form.instance.pk is None
+            ):
+                continue
+            form.nested.save(commit=False)
+            new_answers.extend(form.nested.new_objects)
+            changed_answers.extend(answer for answer, _ in form.nested.changed_objects)
+        Answer.objects.bulk_create(new_answers)
+        Answer.objects.bulk_update(changed_answers, ["answer", "is_correct"])
+
+        generate_thumbnails_on_commit(
+            [
+                form.instance.image
+                for form in self.forms
+                if "image" in form.changed_data and not self._should_delete_form(form)
+            ]
+        )
+
+        return self.new_objects + changed_questions
+
+    def bulk_create_questions(self, questions):
+        if not questions:
+            return
+
+        if connection.features.can_return_rows_from_bulk_insert:
+            Question.objects.bulk_create(questions)
+        else:
+            # Ids are not returned from a bulk insert, but they are assigned in
+            # the insertion order, so they can be fetched right after it.
+            existing_ids = list(
+                Question.objects.filter(quiz=self.instance).values_list("pk", flat=True)
+            )
+            Question.objects.bulk_create(questions)
+            new_ids = (
+                Question.objects.filter(quiz=self.instance)
+                .exclude(pk__in=existing_ids)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            for question, pk in zip(questions, new_ids):
+                question.pk = pk
+
 
 def create_question_formset(number_of_questions, can_delete=False):
     return inlineformset_factory(
@@ -137,30 +259,35 @@ def create_question_formset(number_of_questions, can_delete=False):
 
 
 class TakeQuestionForm(forms.Form):
-    answer = forms.ModelChoiceField(queryset=None, widget=forms.RadioSelect)
+    answer = forms.TypedChoiceField(coerce=int, widget=forms.RadioSelect)
     image = None
     question_body = None
+    question_id = None
 
     def set_question(self, question):
         self.image = question.image
-        self.fields["answer"].queryset = question.answers
+        self.fields["answer"].choices = [
+            (answer.pk, answer.answer) for answer in question.answers.all()
+        ]
         self.fields["answer"].label = ""
         self.question_body = question.question
+        self.question_id = question.pk
 
 
 class BaseTakeQuizFormSet(BaseFormSet):
     def __init__(self, *args, **kwargs):
-        quiz = kwargs.pop("quiz")
+        self.quiz = kwargs.pop("quiz")
         super().__init__(*args, **kwargs)
-        for form, question in zip(self.forms, quiz.questions.all()):
+        for form, question in zip(self.forms, self.quiz.questions.all()):
             form.set_question(question)
 
     def get_score(self):
+        answer_key = self.quiz.get_answer_key()
         score = 0
         for form in self.forms:
             cd = form.cleaned_data
             try:
-                if cd["answer"].is_correct:
+                if cd["answer"] in answer_key.get(form.question_id, ()):
                     score += 1
             except KeyError:
                 pass
@@ -185,6 +312,7 @@ class FilterSortQuizzesForm(forms.Form):
         ("likes", "Number of likes ascending"),
         ("-likes", "Number of likes descending"),
     ]
+    search = forms.CharField(required=False)
     author = forms.CharField(required=False)
     category = forms.ChoiceField(choices=[], required=False)
     sorting = forms.ChoiceField(choices=SORTING_OPTIONS, required=False)
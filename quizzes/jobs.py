@@ -0,0 +1,100 @@
+import logging
+import traceback
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from quizzes.models import Job, PersonalBest, Quiz, QuizStats
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+def job_handler(name):
+    def decorator(handler):
+        JOB_HANDLERS[name] = handler
+        return handler
+
+    return decorator
+
+
+def enqueue(name, payload=None, key=""):
+    # Jobs with a key are deduplicated against the ones which have not been
+    # claimed yet, e.g. there is only one pending flush of likes at a time.
+    if key and Job.objects.filter(key=key, attempts=0, failed_at=None).exists():
+        return None
+    return Job.objects.create(name=name, payload=payload or {}, key=key)
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(failed_at=None, available_at__lte=now)
+            .order_by("available_at", "id")[:limit]
+        )
+        # A claimed job becomes available again when the lock times out, e.g.
+        # when its worker died, so every job is run at least once.
+        available_at = now + timedelta(seconds=settings.JOB_QUEUE_LOCK_TIMEOUT)
+        for job in jobs:
+            job.attempts += 1
+            job.available_at = available_at
+        Job.objects.bulk_update(jobs, ["attempts", "available_at"])
+    return jobs
+
+
+def run_jobs(limit=None):
+    jobs = claim_jobs(limit or settings.JOB_QUEUE_BATCH_SIZE)
+    jobs.sort(key=lambda job: job.name)
+    for name, batch in groupby(jobs, key=lambda job: job.name):
+        batch = list(batch)
+        try:
+            run_batch(name, batch)
+        except Exception:
+            # Retry the jobs one by one, so a single broken job does not hold
+            # back the rest of the batch.
+            for job in batch:
+                try:
+                    run_batch(name, [job])
+                except Exception as e:
+                    fail_job(job, e)
+    return len(jobs)
+
+
+def run_batch(name, jobs):
+    with transaction.atomic():
+        JOB_HANDLERS[name]([job.payload for job in jobs])
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+
+
+def fail_job(job, exception):
+    logger.exception("Job %s failed on attempt %d", job, job.attempts)
+    job.last_error = "".join(
+        traceback.format_exception(type(exception), exception, exception.__traceback__)
+    )
+    if job.attempts >= settings.JOB_QUEUE_MAX_ATTEMPTS:
+        job.failed_at = timezone.now()
+    else:
+        delay = settings.JOB_QUEUE_RETRY_DELAY * 2 ** (job.attempts - 1)
+        job.available_at = timezone.now() + timedelta(seconds=delay)
+    job.save(update_fields=["last_error", "failed_at", "available_at"])
+
+
+@job_handler("recompute_quiz_stats")
+def recompute_quiz_stats(payloads):
+    quiz_ids = {payload["quiz_id"] for payload in payloads}
+    for quiz_id in Quiz.objects.filter(pk__in=quiz_ids).values_list("pk", flat=True):
+        QuizStats.recompute(quiz_id)
+
+
+@job_handler("recompute_personal_best")
+def recompute_personal_bests(payloads):
+    for user_id, quiz_id in {
+        (payload["user_id"], payload["quiz_id"]) for payload in payloads
+    }:
+        PersonalBest.recompute(user_id, quiz_id)
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+from quizzes.jobs import enqueue, job_handler
+from quizzes.models import PendingLike, Quiz
+
+LIKES_KEY_PREFIX = "quiz-likes"
+BUFFERED_LIKES_KEY = f"{LIKES_KEY_PREFIX}-buffered"
+FLUSH_INTERVAL_KEY = f"{LIKES_KEY_PREFIX}-flush-interval"
+FLUSH_ATTEMPTS = 3
+
+
+class LikesAlreadyFlushed(Exception):
+    pass
+
+
+def incr(key, delta=1):
+    cache.add(key, 0, None)
+    return cache.incr(key, delta)
+
+
+def add_like(quiz_id):
+    # Every like is an insert of its own row, so likes never wait for the lock
+    # of the quiz row and survive restarts. The cache only decides when the
+    # buffer is flushed, so losing it merely delays the flush.
+    PendingLike.objects.create(quiz_id=quiz_id)
+
+    buffered_likes = incr(BUFFERED_LIKES_KEY)
+    interval_elapsed = cache.add(
+        FLUSH_INTERVAL_KEY, True, settings.LIKES_FLUSH_INTERVAL
+    )
+    if buffered_likes >= settings.LIKES_FLUSH_THRESHOLD or interval_elapsed:
+        if settings.JOB_QUEUE_ENABLED:
+            enqueue("flush_likes", key="flush-likes")
+        else:
+            flush_likes()
+
+
+def get_buffered_likes(quiz_id):
+    return PendingLike.objects.filter(quiz_id=quiz_id).count()
+
+
+def get_pending_likes():
+    pending = PendingLike.objects.values("quiz_id").annotate(
+        count=Count("pk"), last_pk=Max("pk")
+    )
+    likes = {row["quiz_id"]: row["count"] for row in pending}
+    last_pk = max((row["last_pk"] for row in pending), default=None)
+    return likes, last_pk
+
+
+def claim_pending_likes(last_pk):
+    deleted, _ = PendingLike.objects.filter(pk__lte=last_pk).delete()
+    return deleted
+
+
+@transaction.atomic
+def _flush_likes():
+    likes, last_pk = get_pending_likes()
+    if not likes:
+        return 0
+
+    # Only the flush which deletes exactly the likes it has counted applies
+    # them. Otherwise another flush has claimed some of them, or a like has
+    # been committed in between, and the flush is rolled back and retried.
+    flushed_likes = sum(likes.values())
+    if claim_pending_likes(last_pk) != flushed_likes:
+        raise LikesAlreadyFlushed
+
+    Quiz.objects.increment_counter("likes", likes)
+    return flushed_likes
+
+
+def flush_likes():
+    for _ in range(FLUSH_ATTEMPTS):
+        try:
+            flushed_likes = _flush_likes()
+        except LikesAlreadyFlushed:
+            continue
+        incr(BUFFERED_LIKES_KEY, -flushed_likes)
+        return flushed_likes
+    return 0
+
+
+@job_handler("flush_likes")
+def flush_likes_job(payloads):
+    flush_likes()
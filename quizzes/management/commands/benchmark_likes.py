@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import F
+
+from quizzes.likes import add_like, flush_likes
+from quizzes.models import Quiz
+
+User = get_user_model()
+
+BENCHMARK_USERNAME = "likes-benchmark"
+
+
+def like_with_save(quiz_id):
+    quiz = Quiz.objects.get(pk=quiz_id)
+    quiz.likes = F("likes") + 1
+    quiz.save()
+
+
+def like_with_update(quiz_id):
+    Quiz.objects.increment_counter("likes", {quiz_id: 1})
+
+
+def like_with_buffer(quiz_id):
+    add_like(quiz_id)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures throughput of concurrent quiz likes on the configured database. "
+        "Compares a full-row save, a single column update and the likes buffer."
+    )
+    like_methods = {
+        "save": like_with_save,
+        "update": like_with_update,
+        "buffer": like_with_buffer,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--likes", type=int, default=1000)
+        parser.add_argument("--threads", type=int, default=8)
+
+    def handle(self, *args, **options):
+        number_of_likes = options["likes"]
+        threads = options["threads"]
+        self.stdout.write(
+            f"{connection.vendor}: {number_of_likes} likes, {threads} threads"
+        )
+
+        author, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME)
+        try:
+            for name, like in self.like_methods.items():
+                quiz = Quiz.objects.create(
+                    title=f"{BENCHMARK_USERNAME}-{name}", author=author
+                )
+                elapsed = self.run(like, quiz.pk, number_of_likes, threads)
+                quiz.refresh_from_db()
+                self.stdout.write(
+                    f"{name:>8}: {number_of_likes / elapsed:10.1f} likes/s "
+                    f"({quiz.likes} likes saved)"
+                )
+        finally:
+            author.delete()
+
+    @staticmethod
+    def run(like, quiz_id, number_of_likes, threads):
+        def worker(n):
+            try:
+                for _ in range(n):
+                    like(quiz_id)
+            finally:
+                connection.close()
+
+        likes_per_thread = [number_of_likes // threads] * threads
+        likes_per_thread[0] += number_of_likes % threads
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(worker, likes_per_thread))
+        flush_likes()
+        return time.perf_counter() - start
@@ -0,0 +1,131 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from quizzes.management.commands.benchmark_submissions import threaded_test_database
+from quizzes.models import QuizStats, Score
+from quizzes.scores import ScoreBuffer, save_score
+from quizzes.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a test database and measures how many scores per second can be "
+        "saved by concurrent submissions, one INSERT per score and through the "
+        "score buffer with different batch sizes. Submissions which fail, e.g. "
+        "because the database stays locked, are counted, as are scores lost by "
+        "the buffer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--batch-sizes", type=int, nargs="+", default=[10, 100, 500]
+        )
+        parser.add_argument("--interval", type=float, default=1.0)
+        parser.add_argument("--quizzes", type=int, default=10)
+        parser.add_argument(
+            "--wal",
+            action="store_true",
+            help="Use the write-ahead log on SQLite.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["submissions"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--submissions and --concurrency must be positive.")
+        if any(batch_size < 1 for batch_size in options["batch_sizes"]):
+            raise CommandError("--batch-sizes must be positive.")
+
+        with threaded_test_database():
+            journal_mode = self.set_up_database(options["wal"])
+            results = self.benchmark(options)
+
+        self.stdout.write(
+            f"{connection.vendor} ({journal_mode}): "
+            f"submissions={options['submissions']}, "
+            f"concurrency={options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'mode':<16} {'scores/s':>10} {'seconds':>9} {'failed':>7} {'lost':>7}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16} {result['throughput']:>10.1f} {result['seconds']:>9.2f} "
+                f"{result['failed']:>7} {result['lost']:>7}"
+            )
+
+    @staticmethod
+    def set_up_database(wal):
+        if connection.vendor != "sqlite":
+            return "default"
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+            return cursor.fetchone()[0]
+
+    def benchmark(self, options):
+        seeder = Seeder(prefix="ingestion", seed=options["seed"])
+        user_ids = seeder.create_users(options["concurrency"])
+        popularity = seeder.get_popularity(options["quizzes"], skew=1.0)
+        quiz_ids = seeder.create_quizzes(
+            options["quizzes"], user_ids, popularity, 1, 1, 0, index=False
+        )
+        seeder.create_quiz_stats(quiz_ids)
+        seeder.create_personal_bests(quiz_ids)
+        submissions = [
+            (user_ids[i % len(user_ids)], quiz_ids[i % len(quiz_ids)], i % 101)
+            for i in range(options["submissions"])
+        ]
+
+        results = {"direct": self.measure(options, submissions, save_score)}
+        for batch_size in options["batch_sizes"]:
+            buffer = ScoreBuffer(batch_size, options["interval"])
+
+            def add_score(user_id, quiz_id, percentage):
+                buffer.add(
+                    Score(user_id=user_id, quiz_id=quiz_id, percentage=percentage)
+                )
+
+            results[f"buffered {batch_size}"] = self.measure(
+                options, submissions, add_score, buffer.flush
+            )
+        return results
+
+    def measure(self, options, submissions, submit, flush=None):
+        Score.objects.all().delete()
+        QuizStats.objects.update(
+            attempts=0, percentage_sum=0, min_percentage=None, max_percentage=None
+        )
+        concurrency = options["concurrency"]
+
+        def submit_all(i):
+            failed = 0
+            try:
+                for submission in submissions[i::concurrency]:
+                    try:
+                        submit(*submission)
+                    except DatabaseError:
+                        failed += 1
+            finally:
+                connection.close()
+            return failed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            failed = sum(executor.map(submit_all, range(concurrency)))
+        if flush is not None:
+            flush()
+        elapsed = time.perf_counter() - start
+
+        saved = Score.objects.count()
+        if sum(QuizStats.objects.values_list("attempts", flat=True)) != saved:
+            raise CommandError("Quiz stats do not match the saved scores.")
+        return {
+            "throughput": saved / elapsed,
+            "seconds": elapsed,
+            "failed": failed,
+            "lost": len(submissions) - saved - failed,
+        }
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from quizzes.management.commands.benchmark_views import BENCHMARK_CACHES, percentile
+from quizzes.models import Quiz, Score
+from quizzes.scores import wait_for_pending_scores
+from quizzes.seeding import Seeder
+
+
+@contextmanager
+def threaded_test_database():
+    old_database_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict["TEST"]
+    old_test_name = test_settings.get("NAME")
+    temporary_directory = None
+    if connection.vendor == "sqlite":
+        # Requests are served by many threads, so they need a database file
+        # rather than a per-connection in-memory database.
+        temporary_directory = tempfile.TemporaryDirectory()
+        test_settings["NAME"] = os.path.join(temporary_directory.name, "db")
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_database_name, verbosity=0)
+        teardown_test_environment()
+        test_settings["NAME"] = old_test_name
+        if temporary_directory is not None:
+            temporary_directory.cleanup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a test database and compares the throughput of concurrent quiz "
+        "submissions through the synchronous (WSGI) take view and the async "
+        "(ASGI) one, which saves scores in the background."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--questions", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["submissions"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--submissions and --concurrency must be positive.")
+
+        with threaded_test_database():
+            results = self.benchmark(options)
+
+        self.print_results(options, results)
+
+    def benchmark(self, options):
+        seeder = Seeder(prefix="submissions", seed=options["seed"])
+        user_ids = seeder.create_users(1)
+        quiz_ids = seeder.create_quizzes(
+            1, user_ids, [1.0], options["questions"], options["questions"], 0
+        )
+        seeder.create_quiz_stats(quiz_ids)
+        seeder.create_personal_bests(quiz_ids)
+        user = User.objects.get(pk=user_ids[0])
+        quiz = Quiz.objects.get(pk=quiz_ids[0])
+        data = self.get_take_data(quiz)
+
+        results = {}
+        for name, run in [("wsgi", self.run_wsgi), ("asgi", self.run_asgi)]:
+            scores_before = Score.objects.count()
+            start = time.perf_counter()
+            timings = run(options, user, quiz, data)
+            elapsed = time.perf_counter() - start
+            wait_for_pending_scores()
+            saved = Score.objects.count() - scores_before
+            if saved != options["submissions"]:
+                raise CommandError(
+                    f"{name}: {saved} of {options['submissions']} scores were saved."
+                )
+            results[name] = {
+                "throughput": options["submissions"] / elapsed,
+                "p50_ms": percentile(timings, 50) * 1000,
+                "p95_ms": percentile(timings, 95) * 1000,
+            }
+            connection.close()
+        return results
+
+    @staticmethod
+    def get_take_data(quiz):
+        questions = list(quiz.questions.prefetch_related("answers"))
+        data = {"form-TOTAL_FORMS": len(questions), "form-INITIAL_FORMS": 0}
+        for i, question in enumerate(questions):
+            data[f"form-{i}-answer"] = question.answers.all()[0].pk
+        return data
+
+    @staticmethod
+    def run_wsgi(options, user, quiz, data):
+        url = reverse("quizzes:take", args=[quiz.slug])
+        client = Client()
+        client.force_login(user)
+        cookies = client.cookies
+
+        def submit(_):
+            thread_client = Client()
+            thread_client.cookies = cookies
+            start = time.perf_counter()
+            try:
+                response = thread_client.post(url, data)
+            finally:
+                connection.close()
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}.")
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            return list(executor.map(submit, range(options["submissions"])))
+
+    @staticmethod
+    def run_asgi(options, user, quiz, data):
+        url = reverse("quizzes:take_async", args=[quiz.slug])
+        client = AsyncClient()
+        client.force_login(user)
+        # Django 3.1 cannot read a multipart body sent by the AsyncClient.
+        body = urlencode(data)
+        content_type = "application/x-www-form-urlencoded"
+
+        async def submit(semaphore):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(url, body, content_type)
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}.")
+                return time.perf_counter() - start
+
+        async def submit_all():
+            semaphore = asyncio.Semaphore(options["concurrency"])
+            return await asyncio.gather(
+                *(submit(semaphore) for _ in range(options["submissions"]))
+            )
+
+        return asyncio.run(submit_all())
+
+    def print_results(self, options, results):
+        self.stdout.write(
+            f"{connection.vendor}: submissions={options['submissions']}, "
+            f"concurrency={options['concurrency']}, questions={options['questions']}"
+        )
+        self.stdout.write(f"{'server':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8} {result['throughput']:>9.1f} {result['p50_ms']:>9.2f} "
+                f"{result['p95_ms']:>9.2f}"
+            )
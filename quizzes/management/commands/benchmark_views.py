@@ -0,0 +1,290 @@
+import json
+import math
+import platform
+import time
+import tracemalloc
+from collections import namedtuple
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from quizzes.forms import FilterSortQuizzesForm
+from quizzes.likes import flush_likes
+from quizzes.models import Category, Quiz
+from quizzes.seeding import Seeder
+
+Endpoint = namedtuple("Endpoint", ["name", "method", "url", "data", "kwargs"])
+
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark",
+    },
+    "thumbnails": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark-thumbnails",
+        "TIMEOUT": None,
+    },
+}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a test database and measures the number of queries, p50/p95 "
+        "latency and peak memory of every page. Prints a summary and optionally "
+        "writes a JSON report which can be diffed between releases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--quizzes", type=int, default=200)
+        parser.add_argument("--questions", type=int, default=10)
+        parser.add_argument("--scores", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Path of the JSON report.")
+
+    def handle(self, *args, **options):
+        old_database_name = connection.settings_dict["NAME"]
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                report = self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+            teardown_test_environment()
+
+        self.print_report(report)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Saved {options['output']}."))
+
+    def benchmark(self, options):
+        self.seed(
+            options["seed"],
+            options["users"],
+            options["quizzes"],
+            options["questions"],
+            options["scores"],
+        )
+        quiz = Quiz.objects.select_related("author").order_by("pk").first()
+
+        results = {}
+        for endpoint in self.get_endpoints(quiz):
+            results[endpoint.name] = self.measure(
+                endpoint, quiz.author, options["repeat"]
+            )
+        flush_likes()
+
+        return {
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "data": {
+                "users": options["users"],
+                "quizzes": options["quizzes"],
+                "questions": options["questions"],
+                "scores": options["scores"],
+                "seed": options["seed"],
+            },
+            "repeat": options["repeat"],
+            "endpoints": results,
+        }
+
+    @staticmethod
+    def seed(seed, users, quizzes, questions, scores):
+        seeder = Seeder(prefix="benchmark", seed=seed)
+        user_ids = seeder.create_users(users)
+        popularity = seeder.get_popularity(quizzes, skew=1.0)
+        quiz_ids = seeder.create_quizzes(
+            quizzes, user_ids, popularity, questions, questions, likes=scores // 10
+        )
+        seeder.create_scores(scores, user_ids, quiz_ids, popularity, 60, 20)
+        seeder.create_quiz_stats(quiz_ids)
+        seeder.create_personal_bests(quiz_ids)
+
+    def get_endpoints(self, quiz):
+        list_url = reverse("quizzes:list")
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+        endpoints = [
+            Endpoint("home", "get", reverse("home"), None, {}),
+            Endpoint("quizzes:list", "get", list_url, None, {}),
+        ]
+        for sorting, _ in FilterSortQuizzesForm.SORTING_OPTIONS:
+            if sorting:
+                endpoints.append(
+                    Endpoint(
+                        f"quizzes:list sorting={sorting}",
+                        "get",
+                        f"{list_url}?sorting={sorting}",
+                        None,
+                        {},
+                    )
+                )
+        take_url = reverse("quizzes:take", args=[quiz.slug])
+        update_url = reverse("quizzes:update", args=[quiz.slug])
+        create_url = f"{reverse('quizzes:create')}?questions=1"
+        endpoints += [
+            Endpoint(
+                "quizzes:detail",
+                "get",
+                reverse("quizzes:detail", args=[quiz.slug]),
+                None,
+                {},
+            ),
+            Endpoint("quizzes:take GET", "get", take_url, None, {}),
+            Endpoint(
+                "quizzes:take POST", "post", take_url, self.get_take_data(quiz), {}
+            ),
+            Endpoint(
+                "quizzes:like",
+                "post",
+                reverse("quizzes:like", args=[quiz.slug]),
+                None,
+                ajax,
+            ),
+            Endpoint("quizzes:create GET", "get", create_url, None, {}),
+            Endpoint(
+                "quizzes:create POST", "post", create_url, self.get_create_data, {}
+            ),
+            Endpoint("quizzes:update GET", "get", update_url, None, {}),
+            Endpoint(
+                "quizzes:update POST",
+                "post",
+                update_url,
+                self.get_update_data(quiz),
+                {},
+            ),
+            Endpoint("accounts:profile", "get", reverse("accounts:profile"), None, {}),
+        ]
+        return endpoints
+
+    @staticmethod
+    def get_take_data(quiz):
+        questions = list(quiz.questions.prefetch_related("answers"))
+        data = {"form-TOTAL_FORMS": len(questions), "form-INITIAL_FORMS": 0}
+        for i, question in enumerate(questions):
+            data[f"form-{i}-answer"] = question.answers.all()[0].pk
+        return data
+
+    @staticmethod
+    def get_create_data(i):
+        data = {
+            "title": f"Created benchmark quiz {i}",
+            "description": "",
+            "category": Category.objects.values_list("pk", flat=True).first(),
+            "thumbnail": "",
+            "questions-TOTAL_FORMS": 1,
+            "questions-INITIAL_FORMS": 0,
+            "questions-0-question": "Question",
+            "questions-0-answers-TOTAL_FORMS": 4,
+            "questions-0-answers-INITIAL_FORMS": 0,
+            "questions-0-answers-0-is_correct": "on",
+        }
+        for j in range(4):
+            data[f"questions-0-answers-{j}-answer"] = f"Answer {j}"
+        return data
+
+    @staticmethod
+    def get_update_data(quiz):
+        questions = list(quiz.questions.prefetch_related("answers").order_by("pk"))
+        data = {
+            "title": quiz.title,
+            "description": quiz.description,
+            "category": quiz.category_id,
+            "thumbnail": "",
+            "questions-TOTAL_FORMS": len(questions),
+            "questions-INITIAL_FORMS": len(questions),
+        }
+        for i, question in enumerate(questions):
+            answers = sorted(question.answers.all(), key=lambda answer: answer.pk)
+            data.update(
+                {
+                    f"questions-{i}-id": question.pk,
+                    f"questions-{i}-quiz": quiz.pk,
+                    f"questions-{i}-question": question.question,
+                    f"questions-{i}-answers-TOTAL_FORMS": len(answers),
+                    f"questions-{i}-answers-INITIAL_FORMS": len(answers),
+                }
+            )
+            for j, answer in enumerate(answers):
+                prefix = f"questions-{i}-answers-{j}"
+                data[f"{prefix}-id"] = answer.pk
+                data[f"{prefix}-question"] = question.pk
+                data[f"{prefix}-answer"] = answer.answer
+                if answer.is_correct:
+                    data[f"{prefix}-is_correct"] = "on"
+        return data
+
+    def measure(self, endpoint, user, repeat):
+        timings = []
+        # The first run is a warm-up which fills the caches.
+        for i in range(repeat + 1):
+            status_code, elapsed, queries = self.request(endpoint, user, i)
+            if i:
+                timings.append(elapsed)
+
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            self.request(endpoint, user, repeat + 1)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "method": endpoint.method.upper(),
+            "url": endpoint.url,
+            "status_code": status_code,
+            "queries": queries,
+            "p50_ms": round(percentile(timings, 50) * 1000, 3),
+            "p95_ms": round(percentile(timings, 95) * 1000, 3),
+            "peak_memory_kb": round(peak_memory / 1024, 1),
+        }
+
+    @staticmethod
+    def request(endpoint, user, i):
+        # Every request gets a fresh session, so a like is always written.
+        client = Client()
+        client.force_login(user)
+        data = endpoint.data(i) if callable(endpoint.data) else endpoint.data
+        send = getattr(client, endpoint.method)
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = send(endpoint.url, data, **endpoint.kwargs)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, len(context.captured_queries)
+
+    def print_report(self, report):
+        data = ", ".join(f"{key}={value}" for key, value in report["data"].items())
+        self.stdout.write(f"{report['environment']['database']}: {data}")
+        self.stdout.write(
+            f"{'endpoint':<32} {'status':>6} {'queries':>7} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'peak KB':>9}"
+        )
+        for name, result in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:<32} {result['status_code']:>6} {result['queries']:>7} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['peak_memory_kb']:>9.1f}"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.likes import flush_likes
+
+
+class Command(BaseCommand):
+    help = "Writes buffered quiz likes to the database."
+
+    def handle(self, *args, **options):
+        flushed_likes = flush_likes()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed_likes} likes."))
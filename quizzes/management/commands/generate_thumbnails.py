@@ -0,0 +1,142 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Profile
+from common.thumbnails import create_executor, generate_thumbnails
+from quizzes.models import Question, Quiz
+
+IMAGE_FIELDS = [(Quiz, "thumbnail"), (Question, "image"), (Profile, "photo")]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the missing thumbnails of quiz thumbnails, question images "
+        "and profile photos in a pool of worker processes. Images are processed "
+        "in chunks and the last processed row of every field is saved to the "
+        "checkpoint file, so an interrupted run is resumed where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.THUMBNAIL_WORKERS)
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--checkpoint",
+            default=os.path.join(settings.MEDIA_ROOT, "thumbnails-checkpoint.json"),
+            help="Path of the checkpoint file, by default in MEDIA_ROOT.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint and start from the first image.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate thumbnails which already exist.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--workers and --chunk-size must be positive.")
+
+        checkpoint = {}
+        if not options["restart"]:
+            checkpoint = self.load_checkpoint(options["checkpoint"])
+            if checkpoint:
+                self.stdout.write(f"Resuming from {options['checkpoint']}.")
+
+        self.images = 0
+        self.thumbnails = 0
+        self.start = time.perf_counter()
+        try:
+            with create_executor(options["workers"]) as executor:
+                for model, field_name in IMAGE_FIELDS:
+                    self.generate_field_thumbnails(
+                        model, field_name, executor, checkpoint, options
+                    )
+        except KeyboardInterrupt:
+            self.stdout.write(
+                "Interrupted, run the command again to resume from the checkpoint."
+            )
+            self.write_summary()
+            return
+
+        if os.path.exists(options["checkpoint"]):
+            os.remove(options["checkpoint"])
+        self.write_summary()
+
+    def generate_field_thumbnails(
+        self, model, field_name, executor, checkpoint, options
+    ):
+        label = f"{model._meta.label}.{field_name}"
+        queryset = (
+            model.objects.exclude(**{field_name: ""}).only(field_name).order_by("pk")
+        )
+        # The default image is shared by many rows, so it is resized only for
+        # the first chunk which contains it.
+        default = model._meta.get_field(field_name).default
+        is_default_generated = False
+        while True:
+            instances = list(
+                queryset.filter(pk__gt=checkpoint.get(label, 0))[
+                    : options["chunk_size"]
+                ]
+            )
+            if not instances:
+                return
+
+            fieldfiles = [getattr(instance, field_name) for instance in instances]
+            if is_default_generated:
+                fieldfiles = [
+                    fieldfile for fieldfile in fieldfiles if fieldfile.name != default
+                ]
+            else:
+                is_default_generated = any(
+                    fieldfile.name == default for fieldfile in fieldfiles
+                )
+            self.thumbnails += generate_thumbnails(
+                fieldfiles, executor, options["force"]
+            )
+            self.images += len(instances)
+
+            checkpoint[label] = instances[-1].pk
+            self.save_checkpoint(options["checkpoint"], checkpoint)
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"{label}: up to pk {instances[-1].pk}, "
+                    f"{self.images / self.get_elapsed():.1f} images/s"
+                )
+
+    @staticmethod
+    def load_checkpoint(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            raise CommandError(f"{path} is not a valid checkpoint file.")
+
+    @staticmethod
+    def save_checkpoint(path, checkpoint):
+        # The checkpoint is replaced atomically, so an interrupted write does
+        # not corrupt it.
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(f"{path}.tmp", path)
+
+    def get_elapsed(self):
+        return time.perf_counter() - self.start
+
+    def write_summary(self):
+        elapsed = self.get_elapsed()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {self.thumbnails} thumbnails of {self.images} images "
+                f"in {elapsed:.2f}s ({self.images / elapsed:.1f} images/s)."
+            )
+        )
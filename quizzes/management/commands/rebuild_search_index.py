@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the quizzes search index."
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index has been rebuilt."))
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from common.metrics import (
+    METRIC_BUCKETS,
+    get_request_metrics_summary,
+    reset_request_metrics,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Shows request metrics aggregated by the request metrics middleware, "
+        "grouped by URL name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--json", action="store_true", help="Print the histograms as JSON."
+        )
+        parser.add_argument(
+            "--reset", action="store_true", help="Clear the collected metrics."
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            reset_request_metrics()
+            self.stdout.write(self.style.SUCCESS("Request metrics have been reset."))
+            return
+
+        summary = get_request_metrics_summary()
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        if not summary:
+            self.stdout.write("No request metrics have been collected.")
+            return
+
+        header = f"{'view':<32} {'requests':>8} {'N+1':>5}"
+        for name in METRIC_BUCKETS:
+            header += f" {name + ' mean/p95':>22}"
+        self.stdout.write(header)
+        for view_name, view_summary in summary.items():
+            line = (
+                f"{view_name:<32} {view_summary['requests']:>8} "
+                f"{view_summary['n_plus_one_requests']:>5}"
+            )
+            for metric in view_summary["metrics"].values():
+                p95 = metric["p95"] if metric["p95"] is not None else "inf"
+                line += f" {metric['mean']:>13.1f} / {p95:>5}"
+            self.stdout.write(line)
+
+            for shape, count in view_summary["n_plus_one_shapes"].items():
+                self.stdout.write(f"    N+1 {count}x: {shape}")
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quizzes.jobs import run_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued jobs: score inserts, quiz stats recomputations and like "
+        "flushes. Jobs of the same kind are processed in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.JOB_QUEUE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when there are no jobs to run.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when there are no more jobs to run.",
+        )
+
+    def handle(self, *args, **options):
+        processed_jobs = 0
+        try:
+            while True:
+                jobs = run_jobs(options["batch_size"])
+                processed_jobs += jobs
+                if options["verbosity"] > 1 and jobs:
+                    self.stdout.write(f"Ran {jobs} jobs.")
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed_jobs} jobs."))
@@ -0,0 +1,102 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users, quizzes with questions and answers, and scores using "
+        "bulk inserts in chunked transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--quizzes", type=int, default=1000)
+        parser.add_argument("--scores", type=int, default=100000)
+        parser.add_argument("--min-questions", type=int, default=5)
+        parser.add_argument("--max-questions", type=int, default=15)
+        parser.add_argument(
+            "--popularity-skew",
+            type=float,
+            default=1.0,
+            help="Zipf exponent of quiz popularity, 0 spreads scores evenly.",
+        )
+        parser.add_argument(
+            "--likes",
+            type=int,
+            default=None,
+            help="Total number of likes spread by popularity, "
+            "a tenth of the scores by default.",
+        )
+        parser.add_argument("--score-mean", type=float, default=60)
+        parser.add_argument("--score-stddev", type=float, default=20)
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefix of the generated usernames and quiz titles.",
+        )
+        parser.add_argument(
+            "--no-search-index",
+            action="store_false",
+            dest="index",
+            help="Do not add the generated quizzes to the search index.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 and (options["quizzes"] or options["scores"]):
+            raise CommandError("Quizzes and scores need at least one user.")
+        if options["quizzes"] < 1 and options["scores"]:
+            raise CommandError("Scores need at least one quiz.")
+        if not 0 < options["min_questions"] <= options["max_questions"]:
+            raise CommandError("Invalid range of the number of questions.")
+
+        seeder = Seeder(
+            prefix=options["prefix"],
+            chunk_size=options["chunk_size"],
+            seed=options["seed"],
+            log=self.stdout.write,
+        )
+        if seeder.is_prefix_used():
+            raise CommandError(
+                f"Data with the prefix '{options['prefix']}' already exists, "
+                f"use a different --prefix."
+            )
+
+        likes = options["likes"]
+        if likes is None:
+            likes = options["scores"] // 10
+
+        start = time.perf_counter()
+        user_ids = seeder.create_users(options["users"])
+        popularity = seeder.get_popularity(
+            options["quizzes"], options["popularity_skew"]
+        )
+        quiz_ids = seeder.create_quizzes(
+            options["quizzes"],
+            user_ids,
+            popularity,
+            options["min_questions"],
+            options["max_questions"],
+            likes,
+            index=options["index"],
+        )
+        seeder.create_scores(
+            options["scores"],
+            user_ids,
+            quiz_ids,
+            popularity,
+            options["score_mean"],
+            options["score_stddev"],
+        )
+        seeder.create_quiz_stats(quiz_ids)
+        seeder.create_personal_bests(quiz_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded the database in {time.perf_counter() - start:.1f}s."
+            )
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F
+
+from quizzes.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stored number of questions of every quiz."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report quizzes whose stored number of questions is wrong.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched_quizzes = list(
+            Quiz.objects.annotate(count=Count("questions"))
+            .exclude(question_count=F("count"))
+            .values_list("slug", "question_count", "count")
+        )
+        for slug, question_count, count in mismatched_quizzes:
+            self.stdout.write(f"{slug}: stored {question_count}, actual {count}")
+
+        if options["check"]:
+            if mismatched_quizzes:
+                raise CommandError(
+                    f"{len(mismatched_quizzes)} quizzes have a wrong number of "
+                    f"questions."
+                )
+            self.stdout.write(self.style.SUCCESS("All question counts are correct."))
+            return
+
+        updated_quizzes = Quiz.objects.update_question_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated question counts of {updated_quizzes} quizzes.")
+        )
@@ -0,0 +1,68 @@
+# Generated by Django 3.1.7 on 2026-10-17 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import quizzes.models
+
+
+def fill_quiz_stats(apps, schema_editor):
+    Quiz = apps.get_model("quizzes", "Quiz")
+    QuizStats = apps.get_model("quizzes", "QuizStats")
+    Score = apps.get_model("quizzes", "Score")
+
+    for quiz_id in (
+        Quiz.objects.filter(scores__isnull=False)
+        .distinct()
+        .values_list("id", flat=True)
+    ):
+        stats = QuizStats(quiz_id=quiz_id)
+        for percentage in Score.objects.filter(quiz_id=quiz_id).values_list(
+            "percentage", flat=True
+        ):
+            stats.attempts += 1
+            stats.percentage_sum += percentage
+            if stats.min_percentage is None or percentage < stats.min_percentage:
+                stats.min_percentage = percentage
+            if stats.max_percentage is None or percentage > stats.max_percentage:
+                stats.max_percentage = percentage
+            stats.histogram[min(max(percentage, 0), 100)] += 1
+        stats.average_score = stats.percentage_sum / stats.attempts
+        stats.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0009_quiz_likes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuizStats",
+            fields=[
+                (
+                    "quiz",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="quizzes.quiz",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("percentage_sum", models.PositiveBigIntegerField(default=0)),
+                ("min_percentage", models.IntegerField(null=True)),
+                ("max_percentage", models.IntegerField(null=True)),
+                ("average_score", models.FloatField(db_index=True, default=0)),
+                (
+                    "histogram",
+                    models.JSONField(default=quizzes.models.get_empty_histogram),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "quiz stats",
+            },
+        ),
+        migrations.RunPython(fill_quiz_stats, migrations.RunPython.noop),
+    ]
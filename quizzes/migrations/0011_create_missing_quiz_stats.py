@@ -0,0 +1,26 @@
+# Generated by Django 3.1.7 on 2026-10-17 10:03
+
+from django.db import migrations
+
+
+def create_missing_quiz_stats(apps, schema_editor):
+    Quiz = apps.get_model("quizzes", "Quiz")
+    QuizStats = apps.get_model("quizzes", "QuizStats")
+
+    QuizStats.objects.bulk_create(
+        QuizStats(quiz_id=quiz_id)
+        for quiz_id in Quiz.objects.filter(stats__isnull=True).values_list(
+            "id", flat=True
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0010_quizstats"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_quiz_stats, migrations.RunPython.noop),
+    ]
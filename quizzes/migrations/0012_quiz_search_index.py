@@ -0,0 +1,39 @@
+# Generated by Django 3.1.7 on 2026-10-17 11:26
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    Quiz = apps.get_model("quizzes", "Quiz")
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE quizzes_quiz_fts "
+        "USING fts5(title, description, questions)"
+    )
+    for quiz in Quiz.objects.prefetch_related("questions"):
+        questions = " ".join(question.question for question in quiz.questions.all())
+        schema_editor.execute(
+            "INSERT INTO quizzes_quiz_fts (rowid, title, description, questions) "
+            "VALUES (%s, %s, %s, %s)",
+            [quiz.pk, quiz.title, quiz.description, questions],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute("DROP TABLE quizzes_quiz_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0011_create_missing_quiz_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
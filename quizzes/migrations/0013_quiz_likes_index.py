@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0012_quiz_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="quiz",
+            name="likes",
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 3.1.7 on 2026-10-17 02:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quizzes", "0013_quiz_likes_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="quiz",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="quizzes",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="quiz",
+            name="category",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="quizzes",
+                to="quizzes.category",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="quiz",
+            name="likes",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="score",
+            name="quiz",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="scores",
+                to="quizzes.quiz",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["created", "id"], name="quizzes_qui_created_fadbc5_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["likes", "id"], name="quizzes_qui_likes_b3f050_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["author", "created", "id"],
+                name="quizzes_qui_author__cf79ea_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["author", "likes", "id"], name="quizzes_qui_author__ab9132_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["category", "created", "id"],
+                name="quizzes_qui_categor_a98c82_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["category", "likes", "id"],
+                name="quizzes_qui_categor_d47421_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="score",
+            index=models.Index(
+                fields=["quiz", "percentage"], name="quizzes_sco_quiz_id_6414bf_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.1.7 on 2026-10-17 02:39
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_question_counts(apps, schema_editor):
+    Quiz = apps.get_model("quizzes", "Quiz")
+    for quiz in Quiz.objects.annotate(count=Count("questions")):
+        quiz.question_count = quiz.count
+        quiz.save(update_fields=["question_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0014_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="question_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_question_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["question_count", "id"], name="quizzes_qui_questio_ad6377_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["author", "question_count", "id"],
+                name="quizzes_qui_author__0f0e2e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["category", "question_count", "id"],
+                name="quizzes_qui_categor_ce255b_idx",
+            ),
+        ),
+    ]
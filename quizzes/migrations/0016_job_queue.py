@@ -0,0 +1,52 @@
+# Generated by Django 3.1.7 on 2026-10-17 03:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0015_quiz_question_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=64)),
+                ("payload", models.JSONField(default=dict)),
+                ("key", models.CharField(blank=True, db_index=True, max_length=255)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "available_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("failed_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="score",
+            name="submission_id",
+            field=models.UUIDField(editable=False, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(failed_at__isnull=True),
+                fields=["available_at", "id"],
+                name="quizzes_job_available_idx",
+            ),
+        ),
+    ]
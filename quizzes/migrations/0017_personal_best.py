@@ -0,0 +1,122 @@
+# Generated by Django 3.1.7 on 2026-10-17 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.db.models import Count, Max
+
+
+def fill_personal_bests(apps, schema_editor):
+    Score = apps.get_model("quizzes", "Score")
+    rows = (
+        Score.objects.values("user", "quiz")
+        .annotate(attempts=Count("id"), best=Max("percentage"), last_id=Max("id"))
+        .order_by()
+    )
+    batch = []
+    for row in rows.iterator():
+        batch.append(row)
+        if len(batch) == 1000:
+            create_personal_bests(apps, batch)
+            batch = []
+    create_personal_bests(apps, batch)
+
+
+def create_personal_bests(apps, rows):
+    Score = apps.get_model("quizzes", "Score")
+    PersonalBest = apps.get_model("quizzes", "PersonalBest")
+    last_percentages = dict(
+        Score.objects.filter(pk__in=[row["last_id"] for row in rows]).values_list(
+            "pk", "percentage"
+        )
+    )
+    PersonalBest.objects.bulk_create(
+        PersonalBest(
+            user_id=row["user"],
+            quiz_id=row["quiz"],
+            attempts=row["attempts"],
+            best_percentage=row["best"],
+            last_percentage=last_percentages[row["last_id"]],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quizzes", "0016_job_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PersonalBest",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("best_percentage", models.IntegerField(default=0)),
+                ("last_percentage", models.IntegerField(default=0)),
+                (
+                    "last_attempted",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="score",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="scores",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="score",
+            index=models.Index(
+                fields=["user", "quiz", "-id"], name="quizzes_sco_user_id_ada5c5_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="personalbest",
+            name="quiz",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="personal_bests",
+                to="quizzes.quiz",
+            ),
+        ),
+        migrations.AddField(
+            model_name="personalbest",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="personal_bests",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="personalbest",
+            index=models.Index(
+                fields=["user", "-last_attempted", "-id"],
+                name="quizzes_per_user_id_adfb39_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="personalbest",
+            unique_together={("user", "quiz")},
+        ),
+        migrations.RunPython(fill_personal_bests, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.7 on 2026-10-17 03:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0017_personal_best"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="personalbest",
+            name="best_achieved",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="personalbest",
+            name="quiz",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="personal_bests",
+                to="quizzes.quiz",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="personalbest",
+            index=models.Index(
+                fields=["quiz", "-best_percentage", "best_achieved", "id"],
+                name="quizzes_per_quiz_id_1a196b_idx",
+            ),
+        ),
+    ]
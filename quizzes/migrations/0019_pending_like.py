@@ -0,0 +1,37 @@
+# Generated by Django 3.1.7 on 2026-10-17 03:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0018_leaderboard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingLike",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="quizzes.quiz",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,10 +1,39 @@
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
 from django.conf import settings
-from django.db import models
-from django.db.models import Avg, Count, F
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+)
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
 
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_answer_key_cache_key(quiz_id):
+    return f"quiz-answer-key-{quiz_id}"
+
+
+QUIZ_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+TOP_QUIZZES_CACHE_KEY = "top-quizzes"
+
+
 class Category(models.Model):
     title = models.CharField(max_length=100)
     slug = models.CharField(max_length=100, unique=True)
@@ -18,24 +47,42 @@ class Category(models.Model):
 
 class SortQuizzesQuerySet(models.QuerySet):
     def sort_by_date_created(self, asc):
-        return super().order_by("created" if asc else "-created")
+        return super().order_by(*self.get_ordering("created", asc))
 
     def sort_by_avg_score(self, asc):
         return (
             super()
-            .annotate(avg_score=Avg("scores__percentage"))
-            .order_by("avg_score" if asc else "-avg_score")
+            .filter(stats__isnull=False)
+            .order_by(*self.get_ordering("stats__average_score", asc))
         )
 
     def sort_by_number_of_questions(self, asc):
-        return (
-            super()
-            .annotate(number_of_questions=Count("questions"))
-            .order_by("number_of_questions" if asc else "-number_of_questions")
-        )
+        return super().order_by(*self.get_ordering("question_count", asc))
 
     def sort_by_number_of_likes(self, asc):
-        return super().order_by("likes" if asc else "-likes")
+        return super().order_by(*self.get_ordering("likes", asc))
+
+    @staticmethod
+    def get_ordering(field, asc):
+        return [field, "pk"] if asc else [f"-{field}", "-pk"]
+
+    def update_question_counts(self):
+        question_counts = (
+            Question.objects.filter(quiz=OuterRef("pk"))
+            .order_by()
+            .values("quiz")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.update(question_count=Coalesce(Subquery(question_counts), 0))
+
+    def increment_counter(self, field, amounts):
+        return self.filter(pk__in=amounts.keys()).update(
+            **{
+                field: F(field)
+                + Case(*[When(pk=pk, then=amount) for pk, amount in amounts.items()])
+            }
+        )
 
 
 class Quiz(models.Model):
@@ -43,10 +90,17 @@ class Quiz(models.Model):
     slug = models.CharField(max_length=100, unique=True)
     description = models.TextField(max_length=500, blank=True)
     author = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="quizzes"
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="quizzes",
+        db_index=False,
     )
     category = models.ForeignKey(
-        Category, on_delete=models.SET_NULL, related_name="quizzes", null=True
+        Category,
+        on_delete=models.SET_NULL,
+        related_name="quizzes",
+        null=True,
+        db_index=False,
     )
     created = models.DateField(auto_now_add=True)
     updated = models.DateField(auto_now=True)
@@ -54,11 +108,23 @@ class Quiz(models.Model):
         upload_to="quiz_thumbnails/", default="default-quiz.jpg"
     )
     likes = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0)
 
     objects = SortQuizzesQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Quizzes"
+        indexes = [
+            models.Index(fields=["created", "id"]),
+            models.Index(fields=["likes", "id"]),
+            models.Index(fields=["question_count", "id"]),
+            models.Index(fields=["author", "created", "id"]),
+            models.Index(fields=["author", "likes", "id"]),
+            models.Index(fields=["author", "question_count", "id"]),
+            models.Index(fields=["category", "created", "id"]),
+            models.Index(fields=["category", "likes", "id"]),
+            models.Index(fields=["category", "question_count", "id"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -69,18 +135,93 @@ class Quiz(models.Model):
     def get_absolute_url(self):
         return reverse("quizzes:detail", args=[self.slug])
 
+    @classmethod
+    def get_top_quizzes(cls):
+        quizzes = cache.get(TOP_QUIZZES_CACHE_KEY)
+        if quizzes is None:
+            number_of_quizzes = settings.TOP_QUIZZES_NUMBER
+            quizzes = list(cls.objects.order_by("-likes", "-pk")[:number_of_quizzes])
+            if len(quizzes) < number_of_quizzes:
+                quizzes = []
+            cache.set(
+                TOP_QUIZZES_CACHE_KEY, quizzes, settings.TOP_QUIZZES_CACHE_TIMEOUT
+            )
+        return quizzes
+
+    @staticmethod
+    def clear_top_quizzes_cache():
+        cache.delete(TOP_QUIZZES_CACHE_KEY)
+
     def save(self, *args, **kwargs):
-        self.slug = slugify(self.title)
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "title" in update_fields:
+            self.slug = slugify(self.title)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "slug"}
         super().save(*args, **kwargs)
+        if adding:
+            self.clear_answer_key()
 
     def get_average_score(self):
-        return int(
-            self.scores.aggregate(models.Avg("percentage"))["percentage__avg"] or 0
-        )
+        try:
+            return int(self.stats.average_score)
+        except QuizStats.DoesNotExist:
+            return 0
+
+    def get_percentile_rank(self, percentage):
+        try:
+            return self.stats.get_percentile_rank(percentage)
+        except QuizStats.DoesNotExist:
+            return None
+
+    def get_leaderboard(self):
+        personal_bests = self.personal_bests.select_related("user").order_by(
+            "-best_percentage", "best_achieved", "id"
+        )[: settings.LEADERBOARD_SIZE]
+
+        leaderboard = []
+        for i, personal_best in enumerate(personal_bests):
+            # Users with the same best score share the rank.
+            if leaderboard and (
+                leaderboard[-1][1].best_percentage == personal_best.best_percentage
+            ):
+                rank = leaderboard[-1][0]
+            else:
+                rank = i + 1
+            leaderboard.append((rank, personal_best))
+        return leaderboard
+
+    def get_answer_key(self):
+        answer_key = cache.get(self.get_answer_key_cache_key())
+        if answer_key is None:
+            answer_key = {}
+            correct_answers = Answer.objects.filter(
+                question__quiz=self, is_correct=True
+            ).values_list("question_id", "id")
+            for question_id, answer_id in correct_answers:
+                answer_key.setdefault(question_id, set()).add(answer_id)
+            cache.set(
+                self.get_answer_key_cache_key(), answer_key, ANSWER_KEY_CACHE_TIMEOUT
+            )
+        return answer_key
+
+    def clear_answer_key(self):
+        cache.delete(self.get_answer_key_cache_key())
+
+    def get_answer_key_cache_key(self):
+        return get_answer_key_cache_key(self.pk)
+
+    def get_card_cache_key(self):
+        return f"quiz-card-{self.pk}"
+
+    def clear_card_cache(self):
+        cache.delete(self.get_card_cache_key())
 
     def like(self, session):
-        self.likes = F("likes") + 1
-        self.save()
+        from quizzes.likes import add_like
+
+        add_like(self.pk)
         session[self.get_session_like_str()] = True
 
     def is_liked(self, session):
@@ -90,14 +231,42 @@ class Quiz(models.Model):
         return f"like-{self.slug}"
 
 
+class QuestionQuerySet(models.QuerySet):
+    def delete(self):
+        with transaction.atomic():
+            question_counts = dict(
+                self.values("quiz_id")
+                .annotate(count=Count("id"))
+                .values_list("quiz_id", "count")
+                .order_by()
+            )
+            deleted = super().delete()
+            if question_counts:
+                Quiz.objects.increment_counter(
+                    "question_count",
+                    {quiz_id: -count for quiz_id, count in question_counts.items()},
+                )
+        return deleted
+
+
 class Question(models.Model):
     question = models.TextField(max_length=300)
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions")
     image = models.ImageField(upload_to="questions_images/", blank=True)
 
+    objects = QuestionQuerySet.as_manager()
+
     def __str__(self):
         return self.question
 
+    def delete(self, *args, **kwargs):
+        # Questions have no delete signals, so deleting a quiz does not update
+        # the count of the quiz being deleted. Direct deletes update it here.
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            Quiz.objects.increment_counter("question_count", {self.quiz_id: -1})
+        return deleted
+
 
 class Answer(models.Model):
     answer = models.CharField(max_length=100)
@@ -110,12 +279,287 @@ class Answer(models.Model):
         return self.answer
 
 
+class ScoreQuerySet(models.QuerySet):
+    def delete(self):
+        from quizzes.scores import refresh_personal_bests, refresh_quiz_stats
+
+        with transaction.atomic():
+            user_quiz_ids = set(self.values_list("user_id", "quiz_id").distinct())
+            deleted = super().delete()
+            refresh_quiz_stats({quiz_id for _, quiz_id in user_quiz_ids})
+            refresh_personal_bests(user_quiz_ids)
+        return deleted
+
+
 class Score(models.Model):
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="scores"
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="scores",
+        db_index=False,
+    )
+    quiz = models.ForeignKey(
+        Quiz, on_delete=models.CASCADE, related_name="scores", db_index=False
     )
-    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="scores")
     percentage = models.IntegerField(default=0)
+    submission_id = models.UUIDField(null=True, unique=True, editable=False)
+
+    objects = ScoreQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["quiz", "percentage"]),
+            models.Index(fields=["user", "quiz", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.quiz}:{self.user}-{self.percentage}%"
+
+    def delete(self, *args, **kwargs):
+        from quizzes.scores import refresh_personal_bests, refresh_quiz_stats
+
+        # Scores have no delete signals, so they can be fast deleted when
+        # their quiz or user is deleted. Direct deletes refresh the rollups.
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            refresh_quiz_stats({self.quiz_id})
+            refresh_personal_bests({(self.user_id, self.quiz_id)})
+        return deleted
+
+
+def get_empty_histogram():
+    return [0] * 101
+
+
+class QuizStats(models.Model):
+    quiz = models.OneToOneField(
+        Quiz, on_delete=models.CASCADE, related_name="stats", primary_key=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    percentage_sum = models.PositiveBigIntegerField(default=0)
+    min_percentage = models.IntegerField(null=True)
+    max_percentage = models.IntegerField(null=True)
+    average_score = models.FloatField(default=0, db_index=True)
+    histogram = models.JSONField(default=get_empty_histogram)
+
+    class Meta:
+        verbose_name_plural = "quiz stats"
+
+    def __str__(self):
+        return f"{self.quiz} stats"
+
+    @classmethod
+    def record_score(cls, quiz_id, percentage):
+        with transaction.atomic():
+            stats, _ = cls.objects.select_for_update().get_or_create(quiz_id=quiz_id)
+            stats.add_percentage(percentage)
+            stats.save()
+        return stats
+
+    @classmethod
+    def record_scores(cls, scores):
+        percentages = defaultdict(Counter)
+        for score in scores:
+            percentages[score.quiz_id][score.percentage] += 1
+
+        with transaction.atomic():
+            stats = cls.objects.select_for_update().in_bulk(percentages.keys())
+            for quiz_id, counts in percentages.items():
+                if quiz_id not in stats:
+                    stats[quiz_id], _ = cls.objects.get_or_create(quiz_id=quiz_id)
+                for percentage, count in counts.items():
+                    stats[quiz_id].add_percentage(percentage, count)
+            cls.objects.bulk_update(
+                stats.values(),
+                [
+                    "attempts",
+                    "percentage_sum",
+                    "min_percentage",
+                    "max_percentage",
+                    "average_score",
+                    "histogram",
+                ],
+            )
+        return stats
+
+    @classmethod
+    def recompute(cls, quiz_id):
+        stats = cls(quiz_id=quiz_id)
+        aggregates = Score.objects.filter(quiz_id=quiz_id).aggregate(
+            attempts=Count("id"),
+            percentage_sum=Sum("percentage"),
+            min_percentage=Min("percentage"),
+            max_percentage=Max("percentage"),
+        )
+        stats.attempts = aggregates["attempts"]
+        stats.percentage_sum = aggregates["percentage_sum"] or 0
+        stats.min_percentage = aggregates["min_percentage"]
+        stats.max_percentage = aggregates["max_percentage"]
+        stats.average_score = (
+            stats.percentage_sum / stats.attempts if stats.attempts else 0
+        )
+        percentages = (
+            Score.objects.filter(quiz_id=quiz_id)
+            .values("percentage")
+            .annotate(count=Count("id"))
+            .values_list("percentage", "count")
+        )
+        for percentage, count in percentages:
+            stats.histogram[cls.get_bucket(percentage)] += count
+        stats.save()
+        return stats
+
+    def add_percentage(self, percentage, count=1):
+        self.attempts += count
+        self.percentage_sum += percentage * count
+        if self.min_percentage is None or percentage < self.min_percentage:
+            self.min_percentage = percentage
+        if self.max_percentage is None or percentage > self.max_percentage:
+            self.max_percentage = percentage
+        self.average_score = self.percentage_sum / self.attempts
+        self.histogram[self.get_bucket(percentage)] += count
+
+    def get_percentile_rank(self, percentage):
+        # The share of attempts with a lower score, None if there are none.
+        if not self.attempts:
+            return None
+        beaten = sum(self.histogram[: self.get_bucket(percentage)])
+        return beaten * 100 // self.attempts
+
+    @staticmethod
+    def get_bucket(percentage):
+        return min(max(percentage, 0), 100)
+
+
+class PersonalBest(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="personal_bests",
+        db_index=False,
+    )
+    quiz = models.ForeignKey(
+        Quiz, on_delete=models.CASCADE, related_name="personal_bests", db_index=False
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    best_percentage = models.IntegerField(default=0)
+    best_achieved = models.DateTimeField(default=timezone.now)
+    last_percentage = models.IntegerField(default=0)
+    last_attempted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ["user", "quiz"]
+        indexes = [
+            models.Index(fields=["user", "-last_attempted", "-id"]),
+            # The leaderboard of a quiz is the first rows of this index.
+            models.Index(fields=["quiz", "-best_percentage", "best_achieved", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.quiz}:{self.user}-{self.best_percentage}%"
+
+    @classmethod
+    def record_scores(cls, scores):
+        percentages = defaultdict(list)
+        for score in scores:
+            percentages[score.user_id, score.quiz_id].append(score.percentage)
+        if not percentages:
+            return []
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Rows are created first and then locked, so concurrent first
+            # attempts of the same quiz do not overwrite each other.
+            cls.objects.bulk_create(
+                [
+                    cls(user_id=user_id, quiz_id=quiz_id)
+                    for user_id, quiz_id in percentages
+                ],
+                ignore_conflicts=True,
+            )
+            personal_bests = list(
+                cls.objects.select_for_update().filter(
+                    reduce(
+                        or_,
+                        (
+                            Q(user_id=user_id, quiz_id=quiz_id)
+                            for user_id, quiz_id in percentages
+                        ),
+                    )
+                )
+            )
+            for personal_best in personal_bests:
+                new_percentages = percentages[
+                    personal_best.user_id, personal_best.quiz_id
+                ]
+                best_percentage = max(new_percentages)
+                if (
+                    not personal_best.attempts
+                    or best_percentage > personal_best.best_percentage
+                ):
+                    personal_best.best_percentage = best_percentage
+                    personal_best.best_achieved = now
+                personal_best.attempts += len(new_percentages)
+                personal_best.last_percentage = new_percentages[-1]
+                personal_best.last_attempted = now
+            cls.objects.bulk_update(
+                personal_bests,
+                [
+                    "attempts",
+                    "best_percentage",
+                    "best_achieved",
+                    "last_percentage",
+                    "last_attempted",
+                ],
+            )
+        return personal_bests
+
+    @classmethod
+    def recompute(cls, user_id, quiz_id):
+        scores = Score.objects.filter(user_id=user_id, quiz_id=quiz_id)
+        aggregates = scores.aggregate(attempts=Count("id"), best=Max("percentage"))
+        if not aggregates["attempts"]:
+            cls.objects.filter(user_id=user_id, quiz_id=quiz_id).delete()
+            return None
+
+        personal_best, _ = cls.objects.update_or_create(
+            user_id=user_id,
+            quiz_id=quiz_id,
+            defaults={
+                "attempts": aggregates["attempts"],
+                "best_percentage": aggregates["best"],
+                "last_percentage": scores.order_by("-id")[0].percentage,
+            },
+        )
+        return personal_best
+
+
+class PendingLike(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="+")
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Like of quiz #{self.quiz_id}"
+
+
+class Job(models.Model):
+    name = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    key = models.CharField(max_length=255, blank=True, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                condition=models.Q(failed_at__isnull=True),
+                name="quizzes_job_available_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
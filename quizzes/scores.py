@@ -0,0 +1,235 @@
+import atexit
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+
+from quizzes.jobs import enqueue, job_handler
+from quizzes.models import PersonalBest, Quiz, QuizStats, Score
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending_writes = set()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.SCORE_WRITER_THREADS, thread_name_prefix="score-writer"
+            )
+    return _executor
+
+
+def save_score(user_id, quiz_id, percentage):
+    with transaction.atomic():
+        return Score.objects.create(
+            user_id=user_id, quiz_id=quiz_id, percentage=percentage
+        )
+
+
+def submit_score(user_id, quiz_id, percentage):
+    if settings.JOB_QUEUE_ENABLED:
+        return enqueue(
+            "save_score",
+            {
+                "user_id": user_id,
+                "quiz_id": quiz_id,
+                "percentage": percentage,
+                "submission_id": str(uuid.uuid4()),
+            },
+        )
+    if settings.SCORE_BUFFER_ENABLED:
+        return get_score_buffer().add(
+            Score(user_id=user_id, quiz_id=quiz_id, percentage=percentage)
+        )
+    return save_score(user_id, quiz_id, percentage)
+
+
+class ScoreBuffer:
+    def __init__(self, size, interval):
+        self.size = size
+        self.interval = interval
+        self.scores = []
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def add(self, score):
+        with self.lock:
+            self.scores.append(score)
+            is_full = len(self.scores) >= self.size
+            if not is_full and self.timer is None:
+                self.timer = threading.Timer(self.interval, self.flush_in_thread)
+                self.timer.daemon = True
+                self.timer.start()
+        if is_full:
+            self.flush()
+        return score
+
+    def flush(self):
+        with self.lock:
+            scores, self.scores = self.scores, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not scores:
+            return 0
+
+        try:
+            save_scores(scores)
+        except DatabaseError:
+            # Write the scores one by one, so a single invalid score, e.g. of
+            # a quiz deleted in the meantime, does not lose the whole batch.
+            logger.exception("Could not save a batch of %d scores", len(scores))
+            for score in scores:
+                try:
+                    save_score(score.user_id, score.quiz_id, score.percentage)
+                except DatabaseError:
+                    logger.exception(
+                        "Could not save a score of the quiz %s", score.quiz_id
+                    )
+        return len(scores)
+
+    def flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+_score_buffer = None
+_score_buffer_lock = threading.Lock()
+
+
+def get_score_buffer():
+    global _score_buffer
+    with _score_buffer_lock:
+        if _score_buffer is None:
+            _score_buffer = ScoreBuffer(
+                settings.SCORE_BUFFER_SIZE, settings.SCORE_BUFFER_INTERVAL
+            )
+            atexit.register(_score_buffer.flush)
+    return _score_buffer
+
+
+def flush_score_buffer():
+    if _score_buffer is None:
+        return 0
+    return _score_buffer.flush()
+
+
+@job_handler("save_score")
+def save_queued_scores(payloads):
+    # A job can be run more than once, so scores whose submission is already
+    # saved are skipped.
+    submission_ids = {uuid.UUID(payload["submission_id"]) for payload in payloads}
+    saved_submission_ids = set(
+        Score.objects.filter(submission_id__in=submission_ids).values_list(
+            "submission_id", flat=True
+        )
+    )
+    quiz_ids = set(
+        Quiz.objects.filter(
+            pk__in={payload["quiz_id"] for payload in payloads}
+        ).values_list("pk", flat=True)
+    )
+    user_ids = set(
+        get_user_model()
+        .objects.filter(pk__in={payload["user_id"] for payload in payloads})
+        .values_list("pk", flat=True)
+    )
+
+    scores = []
+    for payload in payloads:
+        submission_id = uuid.UUID(payload["submission_id"])
+        if (
+            submission_id in saved_submission_ids
+            or payload["quiz_id"] not in quiz_ids
+            or payload["user_id"] not in user_ids
+        ):
+            continue
+        saved_submission_ids.add(submission_id)
+        scores.append(
+            Score(
+                user_id=payload["user_id"],
+                quiz_id=payload["quiz_id"],
+                percentage=payload["percentage"],
+                submission_id=submission_id,
+            )
+        )
+
+    return save_scores(scores)
+
+
+def save_scores(scores):
+    # bulk_create does not send post_save signals, so the stats and personal
+    # bests are updated here, in the same transaction as the inserts.
+    with transaction.atomic():
+        Score.objects.bulk_create(scores)
+        QuizStats.record_scores(scores)
+        PersonalBest.record_scores(scores)
+    return scores
+
+
+def _save_score_in_thread(user_id, quiz_id, percentage):
+    try:
+        submit_score(user_id, quiz_id, percentage)
+    except Exception:
+        logger.exception("Could not save a score of the quiz %s", quiz_id)
+        raise
+    finally:
+        connection.close()
+
+
+def save_score_in_background(user_id, quiz_id, percentage):
+    future = get_executor().submit(_save_score_in_thread, user_id, quiz_id, percentage)
+    with _executor_lock:
+        _pending_writes.add(future)
+    future.add_done_callback(_discard_pending_write)
+    return future
+
+
+def _discard_pending_write(future):
+    with _executor_lock:
+        _pending_writes.discard(future)
+
+
+def wait_for_pending_scores(timeout=None):
+    with _executor_lock:
+        futures = list(_pending_writes)
+    return wait(futures, timeout)
+
+
+def refresh_quiz_stats(quiz_ids):
+    # Recomputes the stats after scores are deleted, in a job when the queue
+    # is enabled.
+    if settings.JOB_QUEUE_ENABLED:
+        for quiz_id in quiz_ids:
+            enqueue(
+                "recompute_quiz_stats",
+                {"quiz_id": quiz_id},
+                key=f"recompute-quiz-stats-{quiz_id}",
+            )
+        return
+    for quiz_id in Quiz.objects.filter(pk__in=quiz_ids).values_list("pk", flat=True):
+        QuizStats.recompute(quiz_id)
+
+
+def refresh_personal_bests(user_quiz_ids):
+    if settings.JOB_QUEUE_ENABLED:
+        for user_id, quiz_id in user_quiz_ids:
+            enqueue(
+                "recompute_personal_best",
+                {"user_id": user_id, "quiz_id": quiz_id},
+                key=f"recompute-personal-best-{user_id}-{quiz_id}",
+            )
+        return
+    for user_id, quiz_id in user_quiz_ids:
+        PersonalBest.recompute(user_id, quiz_id)
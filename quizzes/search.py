@@ -0,0 +1,103 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from quizzes.models import Quiz
+
+SEARCH_RESULTS_LIMIT = 1000
+
+
+class BaseSearchBackend:
+    def index_quiz(self, quiz, questions=None):
+        raise NotImplementedError
+
+    def remove_quiz(self, quiz_id):
+        raise NotImplementedError
+
+    def search(self, query, limit=SEARCH_RESULTS_LIMIT):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def rebuild(self):
+        self.clear()
+        for quiz in Quiz.objects.prefetch_related("questions"):
+            self.index_quiz(quiz)
+
+    @staticmethod
+    def get_terms(query):
+        return re.findall(r"\w+", query.lower())
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    def index_quiz(self, quiz, questions=None):
+        pass
+
+    def remove_quiz(self, quiz_id):
+        pass
+
+    def search(self, query, limit=SEARCH_RESULTS_LIMIT):
+        terms = self.get_terms(query)
+        if not terms:
+            return []
+
+        qs = Quiz.objects.all()
+        for term in terms:
+            qs = qs.filter(
+                Q(title__icontains=term)
+                | Q(description__icontains=term)
+                | Q(questions__question__icontains=term)
+            )
+        return list(qs.distinct().values_list("pk", flat=True)[:limit])
+
+    def clear(self):
+        pass
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    table = "quizzes_quiz_fts"
+    # bm25 weights of the title, description and questions columns
+    weights = (10.0, 5.0, 1.0)
+
+    def index_quiz(self, quiz, questions=None):
+        if questions is None:
+            questions = quiz.questions.all()
+        questions = " ".join(question.question for question in questions)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [quiz.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description, questions) "
+                f"VALUES (%s, %s, %s, %s)",
+                [quiz.pk, quiz.title, quiz.description, questions],
+            )
+
+    def remove_quiz(self, quiz_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [quiz_id])
+
+    def search(self, query, limit=SEARCH_RESULTS_LIMIT):
+        terms = self.get_terms(query)
+        if not terms:
+            return []
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+
+def get_search_backend():
+    return import_string(settings.QUIZ_SEARCH_BACKEND)()
@@ -0,0 +1,235 @@
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import Profile
+from quizzes.models import (
+    Answer,
+    Category,
+    PersonalBest,
+    Question,
+    Quiz,
+    QuizStats,
+    Score,
+)
+from quizzes.search import get_search_backend
+
+User = get_user_model()
+
+ANSWERS_PER_QUESTION = 4
+
+
+def chunks(sequence, size):
+    for i in range(0, len(sequence), size):
+        yield sequence[i : i + size]
+
+
+def bulk_create_with_ids(model, objects):
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(objects)
+        return [obj.pk for obj in objects]
+
+    # Ids are not returned from a bulk insert, but they are assigned in the
+    # insertion order, so they can be fetched right after it.
+    last_pk = model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    model.objects.bulk_create(objects)
+    ids = list(
+        model.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)
+    )
+    for obj, pk in zip(objects, ids):
+        obj.pk = pk
+    return ids
+
+
+def insert_rows(model, fields, rows):
+    # Plain executemany skips building model instances, which dominates the
+    # time of bulk_create for the largest tables.
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(quote_name(model._meta.get_field(f).column) for f in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote_name(model._meta.db_table)} ({columns}) "
+            f"VALUES ({placeholders})",
+            rows,
+        )
+
+
+class Seeder:
+    def __init__(self, prefix="seed", chunk_size=10000, seed=None, log=None):
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+    def is_prefix_used(self):
+        return User.objects.filter(username__startswith=f"{self.prefix}-").exists()
+
+    def get_popularity(self, n, skew):
+        # Zipf-like weights, shuffled so the most popular quizzes are not
+        # simply the oldest ones.
+        weights = [1 / (rank + 1) ** skew for rank in range(n)]
+        self.rng.shuffle(weights)
+        return weights
+
+    def create_users(self, n):
+        password = make_password(None)
+        user_ids = []
+        for chunk in self.run_in_chunks("users", range(n)):
+            ids = bulk_create_with_ids(
+                User,
+                [
+                    User(username=f"{self.prefix}-user-{i}", password=password)
+                    for i in chunk
+                ],
+            )
+            Profile.objects.bulk_create([Profile(user_id=pk) for pk in ids])
+            user_ids.extend(ids)
+        return user_ids
+
+    def create_quizzes(
+        self,
+        n,
+        author_ids,
+        popularity,
+        min_questions,
+        max_questions,
+        likes,
+        index=True,
+    ):
+        category_ids = list(Category.objects.values_list("pk", flat=True))
+        if not category_ids:
+            category_ids = [Category.objects.create(title="Seed", slug="seed").pk]
+        total_popularity = sum(popularity)
+        search_backend = get_search_backend()
+
+        quiz_ids = []
+        for chunk in self.run_in_chunks("quizzes", range(n)):
+            quizzes = []
+            for i in chunk:
+                title = f"{self.prefix} quiz {i}"
+                quizzes.append(
+                    Quiz(
+                        title=title,
+                        slug=slugify(title),
+                        description=f"Generated quiz number {i}.",
+                        author_id=self.rng.choice(author_ids),
+                        category_id=self.rng.choice(category_ids),
+                        likes=round(likes * popularity[i] / total_popularity),
+                        question_count=self.rng.randint(min_questions, max_questions),
+                    )
+                )
+            quiz_ids.extend(bulk_create_with_ids(Quiz, quizzes))
+
+            questions = [
+                Question(question=f"Question {j} of {quiz.title}?", quiz_id=quiz.pk)
+                for quiz in quizzes
+                for j in range(quiz.question_count)
+            ]
+            bulk_create_with_ids(Question, questions)
+            answers = []
+            for question in questions:
+                correct = self.rng.randrange(ANSWERS_PER_QUESTION)
+                answers.extend(
+                    (f"Answer {k}", question.pk, k == correct)
+                    for k in range(ANSWERS_PER_QUESTION)
+                )
+            insert_rows(Answer, ["answer", "question", "is_correct"], answers)
+
+            if index:
+                questions_by_quiz = {quiz.pk: [] for quiz in quizzes}
+                for question in questions:
+                    questions_by_quiz[question.quiz_id].append(question)
+                for quiz in quizzes:
+                    search_backend.index_quiz(quiz, questions_by_quiz[quiz.pk])
+        return quiz_ids
+
+    def create_scores(self, n, user_ids, quiz_ids, popularity, mean, stddev):
+        cum_weights = list(accumulate(popularity))
+        for chunk in self.run_in_chunks("scores", range(n)):
+            chosen_quiz_ids = self.rng.choices(
+                quiz_ids, cum_weights=cum_weights, k=len(chunk)
+            )
+            insert_rows(
+                Score,
+                ["user", "quiz", "percentage"],
+                [
+                    (
+                        self.rng.choice(user_ids),
+                        quiz_id,
+                        min(max(round(self.rng.gauss(mean, stddev)), 0), 100),
+                    )
+                    for quiz_id in chosen_quiz_ids
+                ],
+            )
+
+    def create_quiz_stats(self, quiz_ids):
+        for chunk in self.run_in_chunks("quiz stats", quiz_ids):
+            stats = {quiz_id: QuizStats(quiz_id=quiz_id) for quiz_id in chunk}
+            percentages = (
+                Score.objects.filter(quiz_id__in=chunk)
+                .values("quiz_id", "percentage")
+                .annotate(count=Count("id"))
+                .values_list("quiz_id", "percentage", "count")
+                .order_by()
+            )
+            for quiz_id, percentage, count in percentages:
+                stats[quiz_id].add_percentage(percentage, count)
+            QuizStats.objects.bulk_create(stats.values())
+
+    def create_personal_bests(self, quiz_ids):
+        # The personal bests are aggregated by the database, so the scores are
+        # never loaded. The last percentage is the one of the newest score.
+        quote_name = connection.ops.quote_name
+        score_table = quote_name(Score._meta.db_table)
+        columns = ", ".join(
+            quote_name(PersonalBest._meta.get_field(f).column)
+            for f in [
+                "user",
+                "quiz",
+                "attempts",
+                "best_percentage",
+                "best_achieved",
+                "last_percentage",
+                "last_attempted",
+            ]
+        )
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        for chunk in self.run_in_chunks("personal bests", quiz_ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {quote_name(PersonalBest._meta.db_table)} "
+                    f"({columns}) "
+                    f"SELECT s.user_id, s.quiz_id, a.attempts, a.best, %s, "
+                    f"s.percentage, %s "
+                    f"FROM {score_table} s INNER JOIN ("
+                    f"SELECT user_id, quiz_id, COUNT(*) AS attempts, "
+                    f"MAX(percentage) AS best, MAX(id) AS last_id "
+                    f"FROM {score_table} WHERE quiz_id IN ({placeholders}) "
+                    f"GROUP BY user_id, quiz_id"
+                    f") a ON s.id = a.last_id",
+                    [now, now, *chunk],
+                )
+
+    def run_in_chunks(self, name, items):
+        start = time.perf_counter()
+        created = 0
+        for chunk in chunks(items, self.chunk_size):
+            with transaction.atomic():
+                yield chunk
+            created += len(chunk)
+            self.log(f"{name}: {created}/{len(items)}")
+
+        elapsed = time.perf_counter() - start
+        self.log(
+            f"Created {created} {name} in {elapsed:.1f}s "
+            f"({created / elapsed if elapsed else 0:.0f}/s)."
+        )
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from quizzes.models import (
+    Answer,
+    PersonalBest,
+    Question,
+    Quiz,
+    QuizStats,
+    Score,
+    get_answer_key_cache_key,
+)
+from quizzes.scores import refresh_quiz_stats
+from quizzes.search import get_search_backend
+
+
+@receiver(post_save, sender=Score)
+def update_quiz_stats(sender, instance, created, **kwargs):
+    if created:
+        QuizStats.record_score(instance.quiz_id, instance.percentage)
+
+
+@receiver(post_save, sender=Score)
+def update_personal_best(sender, instance, created, **kwargs):
+    if created:
+        PersonalBest.record_scores([instance])
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def remember_scored_quizzes(sender, instance, **kwargs):
+    # The scores are fast deleted with the user, so the stats of the quizzes
+    # they belonged to are refreshed once per quiz after the delete.
+    instance.scored_quiz_ids = set(
+        Score.objects.filter(user=instance).values_list("quiz_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def refresh_stats_of_scored_quizzes(sender, instance, **kwargs):
+    refresh_quiz_stats(getattr(instance, "scored_quiz_ids", ()))
+
+
+@receiver(post_save, sender=Quiz)
+def create_quiz_stats(sender, instance, created, **kwargs):
+    if created:
+        QuizStats.objects.create(quiz_id=instance.pk)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def clear_quiz_card_cache(sender, instance, **kwargs):
+    instance.clear_card_cache()
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def clear_top_quizzes_cache(sender, instance, **kwargs):
+    Quiz.clear_top_quizzes_cache()
+
+
+@receiver(post_delete, sender=Quiz)
+def remove_quiz_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_quiz(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+def increment_question_count(sender, instance, created, **kwargs):
+    if created:
+        Quiz.objects.increment_counter("question_count", {instance.quiz_id: 1})
+
+
+# Deleted questions and answers cannot be submitted, so only saves make the
+# cached answer key stale. Without delete receivers they stay fast deleted.
+@receiver(post_save, sender=Question)
+def clear_answer_key_of_question(sender, instance, **kwargs):
+    cache.delete(get_answer_key_cache_key(instance.quiz_id))
+
+
+@receiver(post_save, sender=Answer)
+def clear_answer_key_of_answer(sender, instance, **kwargs):
+    cache.delete(get_answer_key_cache_key(instance.question.quiz_id))
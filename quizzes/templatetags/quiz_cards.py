@@ -0,0 +1,30 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from common.thumbnails import prefetch_thumbnail_urls
+from quizzes.models import QUIZ_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag
+def quiz_cards(quizzes):
+    keys = {quiz.get_card_cache_key(): quiz for quiz in quizzes}
+    cards = cache.get_many(keys.keys())
+
+    prefetch_thumbnail_urls(
+        [quiz.thumbnail for key, quiz in keys.items() if key not in cards],
+        "quiz_thumbnail",
+    )
+    missing_cards = {
+        key: render_to_string("quizzes/quiz/card.html", {"quiz": quiz})
+        for key, quiz in keys.items()
+        if key not in cards
+    }
+    if missing_cards:
+        cache.set_many(missing_cards, QUIZ_CARD_CACHE_TIMEOUT)
+        cards.update(missing_cards)
+
+    return mark_safe("".join(cards[key] for key in keys))
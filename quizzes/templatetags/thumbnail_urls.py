@@ -0,0 +1,10 @@
+from django import template
+
+from common.thumbnails import get_thumbnail_url
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail_url(source, alias):
+    return get_thumbnail_url(source, alias)
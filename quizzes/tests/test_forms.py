@@ -3,11 +3,11 @@ from django.contrib.auth.models import User
 from django.forms import formset_factory
 from django.test import TestCase
 
-from quizzes.forms import (AnswerFormSet, BaseTakeQuizFormSet,
+from quizzes.forms import (AnswerFormSet, BaseQuestionFormSet, BaseTakeQuizFormSet,
                            FilterSortQuizzesForm, QuizForm, TakeQuestionForm,
                            create_question_formset)
 from quizzes.models import Answer, Category, Question, Quiz
-from quizzes.tests.utils import QuizzesUtilsMixin
+from quizzes.tests.utils import QuizzesUtilsMixin, get_question_formset_data
 
 QuestionFormSet = create_question_formset(number_of_questions=1)
 UpdateQuestionFormSet = create_question_formset(number_of_questions=1, can_delete=True)
@@ -193,6 +193,100 @@ class TestQuestionFormSet(QuizzesUtilsMixin, TestCase):
         self.assertFalse(formset.is_valid())
 
 
+class TestQuestionFormSetBulkSave(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    @staticmethod
+    def get_quiz_content(quiz):
+        return [
+            (
+                question.question,
+                [
+                    (answer.answer, answer.is_correct)
+                    for answer in question.answers.all()
+                ],
+            )
+            for question in Question.objects.filter(quiz=quiz)
+            .order_by("pk")
+            .prefetch_related("answers")
+        ]
+
+    def save_quiz_per_object(self, formset):
+        # The behaviour of the formset before the bulk save was introduced.
+        super(BaseQuestionFormSet, formset).save()
+        for form in formset.forms:
+            if not formset._should_delete_form(form):
+                form.nested.save()
+
+    def create_quizzes_with_questions(self, n):
+        quizzes = []
+        for title in ["Bulk", "Per object"]:
+            quiz = self.create_quiz(title=title)
+            self.add_questions_to_quiz(n, quiz=quiz)
+            quizzes.append(quiz)
+        return quizzes
+
+    def test_creates_the_same_questions_and_answers_as_per_object_save(self):
+        bulk_quiz, per_object_quiz = [
+            self.create_quiz(title=title) for title in ["Bulk", "Per object"]
+        ]
+        data = get_question_formset_data(None, new_questions=3)
+        formset_class = create_question_formset(3)
+        formset = formset_class(data=data, instance=bulk_quiz)
+        self.assertTrue(formset.is_valid())
+        formset.save()
+        formset = formset_class(data=data, instance=per_object_quiz)
+        self.assertTrue(formset.is_valid())
+        self.save_quiz_per_object(formset)
+
+        self.assertEqual(
+            self.get_quiz_content(bulk_quiz), self.get_quiz_content(per_object_quiz)
+        )
+        for quiz in [bulk_quiz, per_object_quiz]:
+            quiz.refresh_from_db()
+            self.assertEqual(quiz.question_count, 3)
+
+    def test_updates_the_same_questions_and_answers_as_per_object_save(self):
+        bulk_quiz, per_object_quiz = self.create_quizzes_with_questions(3)
+        formset_class = create_question_formset(5, can_delete=True)
+        for quiz, save in [
+            (bulk_quiz, lambda formset: formset.save()),
+            (per_object_quiz, self.save_quiz_per_object),
+        ]:
+            data = get_question_formset_data(quiz, new_questions=2, deleted=[1])
+            formset = formset_class(data=data, instance=quiz)
+            self.assertTrue(formset.is_valid())
+            save(formset)
+
+        content = self.get_quiz_content(bulk_quiz)
+        self.assertEqual(content, self.get_quiz_content(per_object_quiz))
+        self.assertEqual(
+            [question for question, _ in content],
+            [f"New question {i}" for i in [0, 2, 3, 4]],
+        )
+        for quiz in [bulk_quiz, per_object_quiz]:
+            quiz.refresh_from_db()
+            self.assertEqual(quiz.question_count, 4)
+
+    def test_number_of_queries_does_not_depend_on_number_of_questions(self):
+        for number_of_questions in [1, 20]:
+            with self.subTest(number_of_questions=number_of_questions):
+                quiz = self.create_quiz(title=f"Quiz {number_of_questions}")
+                data = get_question_formset_data(
+                    None, new_questions=number_of_questions
+                )
+                formset = create_question_formset(number_of_questions)(
+                    data=data, instance=quiz
+                )
+                self.assertTrue(formset.is_valid())
+                with self.assertNumQueries(10):
+                    formset.save()
+
+
 class TestTakeQuizFormSet(QuizzesUtilsMixin, TestCase):
     @classmethod
     def setUpClass(cls):
@@ -232,6 +326,16 @@ class TestTakeQuizFormSet(QuizzesUtilsMixin, TestCase):
         score = formset.get_score()
         self.assertEqual(score, 0)
 
+    def test_get_score_does_not_query_database_when_answer_key_is_cached(self):
+        self.quiz.get_answer_key()
+        quiz = Quiz.objects.prefetch_related("questions__answers").get(pk=self.quiz.pk)
+        data = self.get_formset_data()
+        with self.assertNumQueries(0):
+            formset = self.TakeQuizFormset(quiz=quiz, data=data)
+            formset.is_valid()
+            score = formset.get_score()
+        self.assertEqual(score, 1)
+
     def test_get_score_when_answers_are_not_given(self):
         formset = self.TakeQuizFormset(
             quiz=self.quiz, data={"form-TOTAL_FORMS": 1, "form-INITIAL_FORMS": 0}
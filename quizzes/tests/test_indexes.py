@@ -0,0 +1,136 @@
+import re
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from quizzes.forms import FilterSortQuizzesForm
+from quizzes.tests.utils import QuizzesUtilsMixin
+
+SORTINGS = [value for value, _ in FilterSortQuizzesForm.SORTING_OPTIONS if value]
+FILTERS = [
+    {"author_username": QuizzesUtilsMixin.USERNAME},
+    {"category_slug": QuizzesUtilsMixin.CATEGORY_SLUG},
+    {
+        "author_username": QuizzesUtilsMixin.USERNAME,
+        "category_slug": QuizzesUtilsMixin.CATEGORY_SLUG,
+    },
+]
+
+TABLE_SCAN_REGEX = re.compile(r"^SCAN (?!subquery)")
+FULL_TABLE_SCAN_REGEX = re.compile(r"^SCAN (?!subquery)\w+$")
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+class TestQuizzesListQueryPlans(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        for i in range(10):
+            self.quiz = self.create_quiz(title=f"Quiz {i}")
+            self.create_question()
+
+    def get_list_query_plans(self, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.get_list_url(**kwargs))
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if 'FROM "quizzes_quiz"' not in query["sql"]:
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plans.append([row[-1] for row in cursor.fetchall()])
+        self.assertTrue(plans)
+        return plans
+
+    def test_filtered_list_queries_look_up_quizzes_by_index(self):
+        for filters in FILTERS:
+            for sorting in ["", *SORTINGS]:
+                with self.subTest(sorting=sorting, **filters):
+                    plans = self.get_list_query_plans(sorting=sorting, **filters)
+                    for plan in plans:
+                        for step in plan:
+                            self.assertIsNone(TABLE_SCAN_REGEX.match(step), plan)
+
+    def test_sorted_list_queries_read_quizzes_in_index_order(self):
+        for sorting in SORTINGS:
+            with self.subTest(sorting=sorting):
+                plans = self.get_list_query_plans(sorting=sorting)
+                for plan in plans:
+                    for step in plan:
+                        self.assertIsNone(FULL_TABLE_SCAN_REGEX.match(step), plan)
+                    self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_filtered_and_sorted_by_quiz_columns_list_queries_are_not_sorted(self):
+        for filters in FILTERS:
+            for sorting in [
+                "created",
+                "-created",
+                "length",
+                "-length",
+                "likes",
+                "-likes",
+            ]:
+                with self.subTest(sorting=sorting, **filters):
+                    plans = self.get_list_query_plans(sorting=sorting, **filters)
+                    for plan in plans:
+                        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+class TestScoreHistoryQueryPlans(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        for i in range(5):
+            self.quiz = self.create_quiz(title=f"Quiz {i}")
+            self.create_scores(self.quiz, self.user, [10, 20, 30])
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+
+    def get_query_plans(self, url, table):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {"cursor": ""})
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if f'FROM "{table}"' not in query["sql"]:
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plans.append([row[-1] for row in cursor.fetchall()])
+        self.assertTrue(plans)
+        return plans
+
+    def assertPlansUseIndexOrder(self, plans):
+        for plan in plans:
+            for step in plan:
+                self.assertIsNone(TABLE_SCAN_REGEX.match(step), plan)
+            self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_score_history_reads_personal_bests_in_index_order(self):
+        plans = self.get_query_plans(reverse("quizzes:history"), "quizzes_personalbest")
+        self.assertPlansUseIndexOrder(plans)
+
+    def test_quiz_score_history_reads_scores_in_index_order(self):
+        plans = self.get_query_plans(
+            reverse("quizzes:quiz_history", args=[self.quiz.slug]), "quizzes_score"
+        )
+        self.assertPlansUseIndexOrder(plans)
+
+    def test_leaderboard_reads_personal_bests_in_index_order(self):
+        plans = self.get_query_plans(
+            reverse("quizzes:leaderboard", args=[self.quiz.slug]),
+            "quizzes_personalbest",
+        )
+        self.assertPlansUseIndexOrder(plans)
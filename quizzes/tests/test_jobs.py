@@ -0,0 +1,160 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quizzes import jobs, likes
+from quizzes.jobs import claim_jobs, enqueue, run_jobs
+from quizzes.likes import add_like
+from quizzes.models import Job, PersonalBest, QuizStats, Score
+from quizzes.scores import save_queued_scores, submit_score
+from quizzes.tests.utils import QuizzesUtilsMixin
+
+
+@override_settings(
+    JOB_QUEUE_ENABLED=True,
+    JOB_QUEUE_BATCH_SIZE=100,
+    JOB_QUEUE_LOCK_TIMEOUT=300,
+    JOB_QUEUE_MAX_ATTEMPTS=2,
+    JOB_QUEUE_RETRY_DELAY=10,
+)
+class TestJobQueue(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        cache.clear()
+        self.quiz = self.create_quiz()
+
+    def test_submit_score_enqueues_a_job(self):
+        submit_score(self.user.pk, self.quiz.pk, 50)
+        self.assertFalse(Score.objects.exists())
+        self.assertEqual(Job.objects.get().name, "save_score")
+
+    @override_settings(JOB_QUEUE_ENABLED=False)
+    def test_submit_score_saves_score_when_queue_is_disabled(self):
+        submit_score(self.user.pk, self.quiz.pk, 50)
+        self.assertEqual(Score.objects.get().percentage, 50)
+        self.assertFalse(Job.objects.exists())
+
+    def test_saves_queued_scores_and_updates_stats(self):
+        for percentage in [20, 40, 40]:
+            submit_score(self.user.pk, self.quiz.pk, percentage)
+
+        self.assertEqual(run_jobs(), 3)
+
+        self.assertEqual(Score.objects.count(), 3)
+        self.assertFalse(Job.objects.exists())
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        expected = QuizStats.recompute(self.quiz.pk)
+        self.assertEqual(stats.attempts, 3)
+        self.assertEqual(stats.histogram, expected.histogram)
+        self.assertEqual(stats.average_score, expected.average_score)
+
+    def test_saves_batch_of_scores_with_constant_number_of_queries(self):
+        for i in range(20):
+            submit_score(self.user.pk, self.quiz.pk, i)
+        with self.assertNumQueries(22):
+            run_jobs()
+
+    def test_saving_scores_is_idempotent(self):
+        submit_score(self.user.pk, self.quiz.pk, 50)
+        payload = Job.objects.get().payload
+
+        save_queued_scores([payload])
+        save_queued_scores([payload, payload])
+
+        self.assertEqual(Score.objects.count(), 1)
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).attempts, 1)
+
+    def test_skips_scores_of_deleted_quizzes(self):
+        submit_score(self.user.pk, self.quiz.pk, 50)
+        self.quiz.delete()
+        run_jobs()
+        self.assertFalse(Score.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_claimed_jobs_are_run_again_when_lock_times_out(self):
+        enqueue("flush_likes")
+        self.assertEqual(len(claim_jobs(10)), 1)
+        self.assertEqual(claim_jobs(10), [])
+
+        with mock.patch(
+            "django.utils.timezone.now",
+            return_value=timezone.now() + timedelta(seconds=301),
+        ):
+            self.assertEqual(claim_jobs(10)[0].attempts, 2)
+
+    def test_deduplicates_pending_jobs_with_key(self):
+        enqueue("flush_likes", key="flush-likes")
+        enqueue("flush_likes", key="flush-likes")
+        self.assertEqual(Job.objects.count(), 1)
+
+        claim_jobs(10)
+        enqueue("flush_likes", key="flush-likes")
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_failed_job_does_not_block_batch_and_is_retried(self):
+        handler = mock.Mock(side_effect=ValueError)
+        enqueue("flush_likes")
+        enqueue("broken", {"quiz_id": self.quiz.pk})
+        with mock.patch.dict(jobs.JOB_HANDLERS, {"broken": handler}):
+            with self.assertLogs("quizzes.jobs", "ERROR"):
+                run_jobs()
+
+        job = Job.objects.get()
+        self.assertEqual(job.name, "broken")
+        self.assertIn("ValueError", job.last_error)
+        self.assertGreater(job.available_at, timezone.now())
+        self.assertIsNone(job.failed_at)
+
+    def test_marks_job_as_failed_after_max_attempts(self):
+        handler = mock.Mock(side_effect=ValueError)
+        enqueue("broken")
+        with mock.patch.dict(jobs.JOB_HANDLERS, {"broken": handler}):
+            with self.assertLogs("quizzes.jobs", "ERROR"):
+                for _ in range(2):
+                    Job.objects.update(available_at=timezone.now())
+                    run_jobs()
+
+        job = Job.objects.get()
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.failed_at)
+        self.assertEqual(claim_jobs(10), [])
+
+    @override_settings(LIKES_FLUSH_THRESHOLD=1)
+    def test_like_flush_is_queued(self):
+        add_like(self.quiz.pk)
+        add_like(self.quiz.pk)
+        self.assertEqual(Job.objects.filter(name="flush_likes").count(), 1)
+
+        run_jobs()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 2)
+        self.assertEqual(likes.get_buffered_likes(self.quiz.pk), 0)
+
+    def test_score_deletion_queues_stats_recomputation(self):
+        self.create_scores(self.quiz, self.user, [20, 80])
+        Score.objects.filter(percentage=80).delete()
+        run_jobs()
+
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.attempts, 1)
+        self.assertEqual(stats.max_percentage, 20)
+        personal_best = PersonalBest.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(personal_best.attempts, 1)
+        self.assertEqual(personal_best.best_percentage, 20)
+
+    def test_run_jobs_command(self):
+        submit_score(self.user.pk, self.quiz.pk, 50)
+        output = StringIO()
+        call_command("run_jobs", "--once", stdout=output)
+        self.assertIn("Ran 1 jobs.", output.getvalue())
+        self.assertEqual(Score.objects.count(), 1)
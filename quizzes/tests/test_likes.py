@@ -0,0 +1,107 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from quizzes import likes
+from quizzes.likes import add_like, flush_likes, get_buffered_likes
+from quizzes.tests.utils import QuizzesUtilsMixin
+
+
+@override_settings(LIKES_FLUSH_THRESHOLD=100, LIKES_FLUSH_INTERVAL=60)
+class TestLikesBuffer(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        cache.clear()
+        self.quiz = self.create_quiz()
+        # the first like after an interval flushes the buffer immediately
+        cache.add(likes.FLUSH_INTERVAL_KEY, True, 60)
+
+    def add_likes(self, n, quiz=None):
+        quiz = quiz or self.quiz
+        for _ in range(n):
+            add_like(quiz.pk)
+
+    def test_buffers_likes(self):
+        self.add_likes(3)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 0)
+        self.assertEqual(get_buffered_likes(self.quiz.pk), 3)
+
+    def test_flush_likes(self):
+        self.add_likes(3)
+        self.assertEqual(flush_likes(), 3)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 3)
+        self.assertEqual(get_buffered_likes(self.quiz.pk), 0)
+
+    def test_flush_likes_does_not_count_likes_twice(self):
+        self.add_likes(3)
+        flush_likes()
+        self.add_likes(2)
+        flush_likes()
+        flush_likes()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 5)
+
+    def test_flushes_all_quizzes_with_one_update(self):
+        quiz2 = self.create_quiz(title="quiz2")
+        self.add_likes(3)
+        self.add_likes(2, quiz=quiz2)
+        # count, claim and apply the pending likes in a savepoint
+        with self.assertNumQueries(5):
+            flush_likes()
+        self.quiz.refresh_from_db()
+        quiz2.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 3)
+        self.assertEqual(quiz2.likes, 2)
+
+    def test_flushes_when_threshold_is_reached(self):
+        with self.settings(LIKES_FLUSH_THRESHOLD=5):
+            self.add_likes(5)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 5)
+
+    def test_flushes_when_interval_has_elapsed(self):
+        self.add_likes(2)
+        cache.delete(likes.FLUSH_INTERVAL_KEY)
+        self.add_likes(1)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 3)
+
+    def test_does_not_lose_likes_when_cache_is_lost(self):
+        self.add_likes(4)
+        with mock.patch.object(likes, "cache", LocMemCache("restarted", {})):
+            self.assertEqual(flush_likes(), 4)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 4)
+
+    def test_does_not_apply_likes_claimed_by_another_flush(self):
+        self.add_likes(3)
+        # the first attempt claims none of the likes it has counted
+        claims = iter([lambda last_pk: 0, likes.claim_pending_likes])
+        with mock.patch.object(
+            likes,
+            "claim_pending_likes",
+            side_effect=lambda last_pk: next(claims)(last_pk),
+        ):
+            self.assertEqual(flush_likes(), 3)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 3)
+        self.assertEqual(get_buffered_likes(self.quiz.pk), 0)
+
+    def test_flush_likes_command(self):
+        self.add_likes(2)
+        out = StringIO()
+        call_command("flush_likes", stdout=out)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 2)
+        self.assertIn("Flushed 2 likes.", out.getvalue())
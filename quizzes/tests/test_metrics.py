@@ -0,0 +1,163 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common import metrics
+from common.metrics import (
+    RequestMetrics,
+    get_bucket,
+    get_percentile_bound,
+    get_request_metrics,
+    get_request_metrics_summary,
+    get_sql_shape,
+    get_view_key,
+    reset_request_metrics,
+)
+from quizzes.tests.utils import QuizzesUtilsMixin
+
+
+class TestRequestMetrics(TestCase):
+    @staticmethod
+    def execute(sql, params, many, context):
+        return None
+
+    def test_groups_in_lists_of_different_lengths_into_one_shape(self):
+        self.assertEqual(
+            get_sql_shape("SELECT * FROM t WHERE id IN (%s, %s)"),
+            get_sql_shape("SELECT * FROM t WHERE id IN (%s, %s, %s, %s)"),
+        )
+
+    def test_counts_queries_and_finds_repeated_shapes(self):
+        metrics = RequestMetrics()
+        for i in range(5):
+            metrics(self.execute, "SELECT * FROM t WHERE id = %s", [i], False, {})
+        metrics(self.execute, "SELECT * FROM u", [], False, {})
+
+        self.assertEqual(metrics.queries, 6)
+        self.assertEqual(
+            metrics.get_n_plus_one_shapes(5), {"SELECT * FROM t WHERE id = %s": 5}
+        )
+
+    def test_times_nested_templates_once(self):
+        metrics = RequestMetrics()
+        with mock.patch("common.metrics.time.perf_counter", side_effect=[0, 1, 3]):
+            with metrics.time_template():
+                with metrics.time_template():
+                    pass
+        self.assertEqual(metrics.template_time, 3)
+
+    def test_get_bucket(self):
+        self.assertEqual(get_bucket(0, [1, 5]), 0)
+        self.assertEqual(get_bucket(5, [1, 5]), 1)
+        self.assertEqual(get_bucket(6, [1, 5]), 2)
+
+    def test_get_percentile_bound(self):
+        self.assertEqual(get_percentile_bound([5, 4, 1], [1, 5], 50), 1)
+        self.assertEqual(get_percentile_bound([5, 4, 1], [1, 5], 90), 5)
+        self.assertIsNone(get_percentile_bound([5, 4, 1], [1, 5], 95))
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class TestRequestMetricsMiddleware(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        cache.clear()
+        reset_request_metrics()
+        self.quiz = self.create_quiz()
+        self.create_question()
+
+    def test_tags_metrics_with_url_names(self):
+        self.client.get(reverse("home"))
+        self.client.get(self.get_list_url())
+        self.client.get(self.get_list_url())
+
+        metrics = get_request_metrics()
+        self.assertEqual(metrics["home"]["requests"], 1)
+        self.assertEqual(metrics["quizzes:list"]["requests"], 2)
+
+    def test_records_number_of_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.get_quiz_detail_url(self.quiz.slug))
+
+        metrics = get_request_metrics()["quizzes:detail"]["metrics"]
+        self.assertEqual(metrics["queries"]["sum"], len(context.captured_queries))
+        self.assertGreater(metrics["db_ms"]["sum"], 0)
+
+    def test_records_template_render_time(self):
+        self.client.get(self.get_list_url())
+
+        metrics = get_request_metrics()["quizzes:list"]["metrics"]
+        self.assertGreater(metrics["template_ms"]["sum"], 0)
+        self.assertLessEqual(metrics["template_ms"]["sum"], metrics["total_ms"]["sum"])
+
+    def test_records_render_time_of_templates_outside_template_responses(self):
+        data = {"form-TOTAL_FORMS": 1, "form-INITIAL_FORMS": 0}
+        self.client.post(self.get_take_quiz_url(self.quiz.slug), data=data)
+
+        metrics = get_request_metrics()["quizzes:take"]["metrics"]
+        self.assertGreater(metrics["template_ms"]["sum"], 0)
+
+    @override_settings(REQUEST_METRICS_FLUSH_INTERVAL=60)
+    def test_aggregates_requests_in_process_until_flush(self):
+        with mock.patch.object(
+            metrics, "metrics_lock", wraps=metrics.metrics_lock
+        ) as lock:
+            for _ in range(3):
+                self.client.get(reverse("home"))
+            lock.assert_not_called()
+            self.assertIsNone(cache.get(get_view_key("home")))
+
+            self.assertEqual(get_request_metrics()["home"]["requests"], 3)
+        lock.assert_called_once()
+
+    @override_settings(REQUEST_METRICS_FLUSH_INTERVAL=0)
+    def test_flushes_metrics_when_interval_has_elapsed(self):
+        self.client.get(reverse("home"))
+        self.client.get(reverse("home"))
+        self.assertEqual(cache.get(get_view_key("home"))["requests"], 2)
+
+    @override_settings(REQUEST_METRICS_N_PLUS_ONE_THRESHOLD=1)
+    def test_flags_repeated_queries(self):
+        with self.assertLogs("common.metrics", "WARNING"):
+            self.client.get(self.get_list_url())
+
+        metrics = get_request_metrics()["quizzes:list"]
+        self.assertEqual(metrics["n_plus_one_requests"], 1)
+        self.assertTrue(metrics["n_plus_one_shapes"])
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_does_not_record_metrics_when_disabled(self):
+        self.client.get(reverse("home"))
+        self.assertEqual(get_request_metrics(), {})
+
+    def test_metrics_endpoint_is_only_for_staff(self):
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+        response = self.client.get(reverse("request_metrics"))
+        self.assertEqual(response.status_code, 302)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.get(reverse("home"))
+        response = self.client.get(reverse("request_metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["home"]["requests"], 1)
+
+    def test_request_metrics_command(self):
+        self.client.get(reverse("home"))
+        output = StringIO()
+        call_command("request_metrics", stdout=output)
+        self.assertIn("home", output.getvalue())
+
+        call_command("request_metrics", "--reset", stdout=StringIO())
+        self.assertEqual(get_request_metrics_summary(), {})
@@ -1,9 +1,24 @@
 import datetime
+from io import StringIO
 from unittest.mock import Mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-from quizzes.models import Answer, Category, Question, Quiz, Score
+from quizzes.likes import flush_likes
+from quizzes.models import (
+    Answer,
+    Category,
+    PersonalBest,
+    Question,
+    Quiz,
+    QuizStats,
+    Score,
+)
 from quizzes.tests.utils import QuizzesUtilsMixin
 
 
@@ -21,6 +36,7 @@ class TestQuiz(QuizzesUtilsMixin, TestCase):
         cls.category = cls.create_category()
 
     def setUp(self):
+        cache.clear()
         self.quiz = self.create_quiz()
 
     def test_str(self):
@@ -32,6 +48,34 @@ class TestQuiz(QuizzesUtilsMixin, TestCase):
     def test_slugify_title(self):
         self.assertEqual(self.quiz.slug, self.QUIZ_SLUG)
 
+    def test_does_not_slugify_title_when_it_is_not_updated(self):
+        self.quiz.title = "New title"
+        self.quiz.save(update_fields=["description"])
+        self.assertEqual(self.quiz.slug, self.QUIZ_SLUG)
+
+    def test_saves_slug_when_title_is_updated(self):
+        self.quiz.title = "New title"
+        self.quiz.save(update_fields=["title"])
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.slug, "new-title")
+
+    def test_increment_counter(self):
+        quiz2 = self.create_quiz(title="quiz2")
+        Quiz.objects.increment_counter("likes", {self.quiz.pk: 3, quiz2.pk: 1})
+        self.quiz.refresh_from_db()
+        quiz2.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 3)
+        self.assertEqual(quiz2.likes, 1)
+
+    def test_increment_counter_does_not_touch_other_columns(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(
+            updated=datetime.date(2000, 1, 1), slug="old-slug"
+        )
+        Quiz.objects.increment_counter("likes", {self.quiz.pk: 1})
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.updated, datetime.date(2000, 1, 1))
+        self.assertEqual(self.quiz.slug, "old-slug")
+
     def test_get_absolute_url(self):
         expected_url = f"/quizzes/detail/{self.QUIZ_SLUG}/"
         self.assertEqual(self.quiz.get_absolute_url(), expected_url)
@@ -91,6 +135,72 @@ class TestQuiz(QuizzesUtilsMixin, TestCase):
             Quiz.objects.sort_by_number_of_questions(asc=False), expected[::-1]
         )
 
+    def test_question_count_follows_created_and_deleted_questions(self):
+        question = self.create_question()
+        self.create_question()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.question_count, 2)
+
+        question.delete()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.question_count, 1)
+
+    def test_bulk_delete_updates_question_counts_at_once(self):
+        quiz2 = self.create_quiz(title="quiz2")
+        for quiz in [self.quiz, self.quiz, self.quiz, quiz2, quiz2]:
+            self.create_question(quiz=quiz)
+
+        with CaptureQueriesContext(connection) as context:
+            Question.objects.filter(quiz__in=[self.quiz, quiz2]).exclude(
+                pk=self.quiz.questions.first().pk
+            ).delete()
+
+        quiz_table = connection.ops.quote_name(Quiz._meta.db_table)
+        updates = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith(f"UPDATE {quiz_table}")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.quiz.refresh_from_db()
+        quiz2.refresh_from_db()
+        self.assertEqual(self.quiz.question_count, 1)
+        self.assertEqual(quiz2.question_count, 0)
+
+    def test_deleting_quiz_does_not_update_its_question_count(self):
+        self.create_question()
+        self.create_question()
+
+        with CaptureQueriesContext(connection) as context:
+            self.quiz.delete()
+
+        quiz_table = connection.ops.quote_name(Quiz._meta.db_table)
+        self.assertFalse(
+            any(
+                query["sql"].startswith(f"UPDATE {quiz_table}")
+                for query in context.captured_queries
+            )
+        )
+
+    def test_update_question_counts(self):
+        self.add_questions_to_quiz(3)
+        Quiz.objects.update(question_count=0)
+
+        Quiz.objects.update_question_counts()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.question_count, 3)
+
+    def test_update_question_counts_command(self):
+        self.add_questions_to_quiz(2)
+        Quiz.objects.update(question_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command("update_question_counts", "--check", stdout=StringIO())
+        call_command("update_question_counts", stdout=StringIO())
+        call_command("update_question_counts", "--check", stdout=StringIO())
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.question_count, 2)
+
     def test_sort_by_number_of_likes(self):
         quiz2 = self.create_quiz(title="quiz2")
         self.quiz.likes = 5
@@ -108,10 +218,29 @@ class TestQuiz(QuizzesUtilsMixin, TestCase):
         quiz_likes = self.quiz.likes
         fake_session = {}
         self.quiz.like(fake_session)
+        flush_likes()
         self.quiz.refresh_from_db()
         self.assertEqual(self.quiz.likes, quiz_likes + 1)
         self.assertTrue(fake_session[self.quiz.get_session_like_str()])
 
+    def test_get_answer_key(self):
+        question = self.create_question()
+        correct_answer = question.answers.get(is_correct=True)
+        self.assertEqual(self.quiz.get_answer_key(), {question.pk: {correct_answer.pk}})
+
+    def test_get_answer_key_is_cached(self):
+        self.create_question()
+        self.quiz.get_answer_key()
+        with self.assertNumQueries(0):
+            self.quiz.get_answer_key()
+
+    def test_clear_answer_key(self):
+        question = self.create_question()
+        self.quiz.get_answer_key()
+        new_answer = question.answers.create(answer="E", is_correct=True)
+        self.quiz.clear_answer_key()
+        self.assertIn(new_answer.pk, self.quiz.get_answer_key()[question.pk])
+
     def test_is_liked(self):
         fake_session = {}
         self.assertFalse(self.quiz.is_liked(fake_session))
@@ -119,6 +248,219 @@ class TestQuiz(QuizzesUtilsMixin, TestCase):
         self.assertTrue(self.quiz.is_liked(fake_session))
 
 
+class TestQuizStats(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.quiz = self.create_quiz()
+
+    def test_str(self):
+        stats = QuizStats(quiz=self.quiz)
+        self.assertEqual(str(stats), f"{self.quiz} stats")
+
+    def test_is_updated_when_score_is_created(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100, 60])
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.attempts, 3)
+        self.assertEqual(stats.percentage_sum, 180)
+        self.assertEqual(stats.min_percentage, 20)
+        self.assertEqual(stats.max_percentage, 100)
+        self.assertEqual(stats.average_score, 60)
+        self.assertEqual(stats.histogram[20], 1)
+        self.assertEqual(stats.histogram[60], 1)
+        self.assertEqual(stats.histogram[100], 1)
+        self.assertEqual(sum(stats.histogram), 3)
+
+    def test_recompute(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100, 60])
+        QuizStats.objects.filter(quiz=self.quiz).delete()
+        QuizStats.recompute(self.quiz.id)
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.attempts, 3)
+        self.assertEqual(stats.percentage_sum, 180)
+        self.assertEqual(stats.min_percentage, 20)
+        self.assertEqual(stats.max_percentage, 100)
+        self.assertEqual(stats.average_score, 60)
+        self.assertEqual(sum(stats.histogram), 3)
+
+    def test_is_recomputed_when_scores_are_deleted(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100, 60])
+        Score.objects.filter(percentage=100).delete()
+        Score.objects.get(percentage=20).delete()
+
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.attempts, 1)
+        self.assertEqual(stats.max_percentage, 60)
+        personal_best = PersonalBest.objects.get()
+        self.assertEqual(personal_best.attempts, 1)
+        self.assertEqual(personal_best.best_percentage, 60)
+
+    def test_is_recomputed_when_user_is_deleted(self):
+        user2 = self.create_user(username="User2", email="user2@gmail.com")
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20])
+        self.create_scores(quiz=self.quiz, user=user2, scores=[100, 60])
+        user2.delete()
+
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.attempts, 1)
+        self.assertEqual(stats.max_percentage, 20)
+
+    def test_scores_are_fast_deleted_with_quiz(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100])
+        collector = Collector(using=connection.alias)
+        self.assertTrue(collector.can_fast_delete(self.quiz.scores.all()))
+
+    def test_get_percentile_rank(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 40, 40, 80])
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual(stats.get_percentile_rank(0), 0)
+        self.assertEqual(stats.get_percentile_rank(40), 25)
+        self.assertEqual(stats.get_percentile_rank(50), 75)
+        self.assertEqual(stats.get_percentile_rank(100), 100)
+
+    def test_get_percentile_rank_without_attempts(self):
+        self.assertIsNone(QuizStats(quiz=self.quiz).get_percentile_rank(50))
+
+    def test_quiz_get_percentile_rank_without_stats(self):
+        QuizStats.objects.filter(quiz=self.quiz).delete()
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        self.assertIsNone(quiz.get_percentile_rank(50))
+
+    def test_get_average_score_does_not_aggregate_scores(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100])
+        quiz = Quiz.objects.select_related("stats").get(pk=self.quiz.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(quiz.get_average_score(), 60)
+
+
+class TestPersonalBest(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.quiz = self.create_quiz()
+
+    def test_str(self):
+        personal_best = PersonalBest(user=self.user, quiz=self.quiz, best_percentage=80)
+        self.assertEqual(str(personal_best), f"{self.quiz}:{self.user}-80%")
+
+    def test_is_updated_when_score_is_created(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100, 60])
+        personal_best = PersonalBest.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(personal_best.attempts, 3)
+        self.assertEqual(personal_best.best_percentage, 100)
+        self.assertEqual(personal_best.last_percentage, 60)
+
+    def test_first_score_of_zero_is_best(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[0])
+        personal_best = PersonalBest.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(personal_best.best_percentage, 0)
+
+    def test_record_scores_updates_personal_bests_of_batch_at_once(self):
+        user2 = self.create_user(username="User2", email="user2@gmail.com")
+        quiz2 = self.create_quiz(title="Quiz2")
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[50])
+        scores = [
+            Score(user=self.user, quiz=self.quiz, percentage=30),
+            Score(user=self.user, quiz=self.quiz, percentage=70),
+            Score(user=user2, quiz=self.quiz, percentage=10),
+            Score(user=self.user, quiz=quiz2, percentage=90),
+        ]
+
+        with self.assertNumQueries(5):
+            PersonalBest.record_scores(scores)
+
+        personal_best = PersonalBest.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(personal_best.attempts, 3)
+        self.assertEqual(personal_best.best_percentage, 70)
+        self.assertEqual(personal_best.last_percentage, 70)
+        self.assertEqual(
+            PersonalBest.objects.get(user=user2, quiz=self.quiz).attempts, 1
+        )
+        self.assertEqual(
+            PersonalBest.objects.get(user=self.user, quiz=quiz2).best_percentage, 90
+        )
+
+    def test_best_achieved_changes_only_when_best_score_improves(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[60])
+        best_achieved = PersonalBest.objects.get().best_achieved
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[60, 40])
+        self.assertEqual(PersonalBest.objects.get().best_achieved, best_achieved)
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[70])
+        self.assertGreater(PersonalBest.objects.get().best_achieved, best_achieved)
+
+    def test_recompute(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20, 100, 60])
+        Score.objects.filter(percentage=100).delete()
+
+        personal_best = PersonalBest.recompute(self.user.pk, self.quiz.pk)
+        self.assertEqual(personal_best.attempts, 2)
+        self.assertEqual(personal_best.best_percentage, 60)
+        self.assertEqual(personal_best.last_percentage, 60)
+
+    def test_recompute_deletes_personal_best_without_scores(self):
+        self.create_scores(quiz=self.quiz, user=self.user, scores=[20])
+        Score.objects.all().delete()
+
+        self.assertIsNone(PersonalBest.recompute(self.user.pk, self.quiz.pk))
+        self.assertFalse(PersonalBest.objects.exists())
+
+
+class TestLeaderboard(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.quiz = self.create_quiz()
+
+    def create_users_with_scores(self, best_scores):
+        users = []
+        for i, best_score in enumerate(best_scores):
+            user = self.create_user(username=f"User{i}", email=f"user{i}@gmail.com")
+            self.create_scores(quiz=self.quiz, user=user, scores=[0, best_score])
+            users.append(user)
+        return users
+
+    def get_leaderboard(self):
+        return [
+            (rank, personal_best.user.username)
+            for rank, personal_best in self.quiz.get_leaderboard()
+        ]
+
+    def test_ranks_users_by_best_score(self):
+        self.create_users_with_scores([40, 90, 70])
+        self.assertEqual(
+            self.get_leaderboard(), [(1, "User1"), (2, "User2"), (3, "User0")]
+        )
+
+    def test_users_with_same_best_score_share_rank_in_order_of_achieving(self):
+        self.create_users_with_scores([50, 80, 50, 30])
+        self.assertEqual(
+            self.get_leaderboard(),
+            [(1, "User1"), (2, "User0"), (2, "User2"), (4, "User3")],
+        )
+
+    @override_settings(LEADERBOARD_SIZE=2)
+    def test_returns_configured_number_of_users(self):
+        self.create_users_with_scores([10, 20, 30])
+        self.assertEqual(self.get_leaderboard(), [(1, "User2"), (2, "User1")])
+
+    def test_does_not_include_other_quizzes(self):
+        quiz2 = self.create_quiz(title="Quiz2")
+        self.create_scores(quiz=quiz2, user=self.user, scores=[100])
+        self.assertEqual(self.get_leaderboard(), [])
+
+
 class TestQuestion(TestCase):
     def test_str(self):
         question = Question(question="question")
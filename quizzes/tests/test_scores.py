@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from quizzes import scores
+from quizzes.models import QuizStats, Score
+from quizzes.scores import ScoreBuffer, flush_score_buffer, submit_score
+from quizzes.tests.utils import QuizzesUtilsMixin
+
+
+class TestScoreBuffer(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.quiz = self.create_quiz()
+        self.buffer = ScoreBuffer(size=3, interval=60)
+
+    def tearDown(self):
+        self.buffer.flush()
+
+    def add_scores(self, percentages):
+        for percentage in percentages:
+            self.buffer.add(
+                Score(user=self.user, quiz=self.quiz, percentage=percentage)
+            )
+
+    def test_buffers_scores(self):
+        self.add_scores([10, 20])
+        self.assertFalse(Score.objects.exists())
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(Score.objects.count(), 2)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_saves_scores_when_buffer_is_full(self):
+        with self.assertNumQueries(12):
+            self.add_scores([10, 20, 30])
+        self.assertEqual(Score.objects.count(), 3)
+
+    def test_updates_quiz_stats(self):
+        self.add_scores([10, 20, 30, 40])
+        self.buffer.flush()
+
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        expected = QuizStats.recompute(self.quiz.pk)
+        self.assertEqual(stats.attempts, 4)
+        self.assertEqual(stats.average_score, expected.average_score)
+        self.assertEqual(stats.histogram, expected.histogram)
+
+    def test_saves_scores_one_by_one_when_batch_fails(self):
+        self.add_scores([10, 20])
+        with mock.patch.object(
+            Score.objects, "bulk_create", side_effect=DatabaseError
+        ), self.assertLogs("quizzes.scores", "ERROR"):
+            self.buffer.flush()
+
+        self.assertEqual(Score.objects.count(), 2)
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).attempts, 2)
+
+    @override_settings(
+        SCORE_BUFFER_ENABLED=True, SCORE_BUFFER_SIZE=100, SCORE_BUFFER_INTERVAL=60
+    )
+    def test_submit_score_uses_buffer_when_enabled(self):
+        with mock.patch.object(scores, "_score_buffer", None):
+            submit_score(self.user.pk, self.quiz.pk, 50)
+            self.assertFalse(Score.objects.exists())
+            self.assertEqual(flush_score_buffer(), 1)
+        self.assertEqual(Score.objects.get().percentage, 50)
+
+    def test_submit_score_saves_score_when_buffer_is_disabled(self):
+        submit_score(self.user.pk, self.quiz.pk, 50)
+        self.assertEqual(Score.objects.get().percentage, 50)
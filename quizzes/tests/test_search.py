@@ -0,0 +1,93 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from quizzes.search import SimpleSearchBackend, SQLiteSearchBackend, get_search_backend
+from quizzes.tests.utils import QuizzesUtilsMixin
+
+
+class SearchBackendTestMixin(QuizzesUtilsMixin):
+    backend_class = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.backend = self.backend_class()
+        self.quiz = self.create_quiz(title="Capitals", description="European cities")
+        self.create_question(question_body="What is the capital of Poland?")
+        self.backend.index_quiz(self.quiz)
+
+    def test_finds_quiz_by_title(self):
+        self.assertEqual(self.backend.search("capitals"), [self.quiz.pk])
+
+    def test_finds_quiz_by_description(self):
+        self.assertEqual(self.backend.search("european"), [self.quiz.pk])
+
+    def test_finds_quiz_by_question(self):
+        self.assertEqual(self.backend.search("Poland"), [self.quiz.pk])
+
+    def test_matches_prefixes(self):
+        self.assertEqual(self.backend.search("pol"), [self.quiz.pk])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.backend.search("poland germany"), [])
+
+    def test_returns_empty_list_when_query_has_no_terms(self):
+        self.assertEqual(self.backend.search('"*'), [])
+
+
+class TestSQLiteSearchBackend(SearchBackendTestMixin, TestCase):
+    backend_class = SQLiteSearchBackend
+
+    def test_remove_quiz(self):
+        self.backend.remove_quiz(self.quiz.pk)
+        self.assertEqual(self.backend.search("capitals"), [])
+
+
+class TestSimpleSearchBackend(SearchBackendTestMixin, TestCase):
+    backend_class = SimpleSearchBackend
+
+
+class TestSearchIndex(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.backend = get_search_backend()
+
+    def test_ranks_title_matches_first(self):
+        in_description = self.create_quiz(title="First", description="rivers")
+        in_title = self.create_quiz(title="Rivers", description="Second")
+        self.backend.index_quiz(in_description)
+        self.backend.index_quiz(in_title)
+        self.assertEqual(
+            self.backend.search("rivers"), [in_title.pk, in_description.pk]
+        )
+
+    def test_indexes_quiz_when_it_is_created(self):
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+        self.post_create_view_with_one_question_quiz(question_body="Volcanoes")
+        self.assertEqual(len(self.backend.search("volcanoes")), 1)
+
+    def test_removes_quiz_from_index_when_it_is_deleted(self):
+        quiz = self.create_quiz()
+        self.backend.index_quiz(quiz)
+        quiz.delete()
+        self.assertEqual(self.backend.search(self.QUIZ_TITLE), [])
+
+    def test_rebuild_search_index_command(self):
+        quiz = self.create_quiz()
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.backend.search(self.QUIZ_TITLE), [quiz.pk])
+
+    @override_settings(QUIZ_SEARCH_BACKEND="quizzes.search.SimpleSearchBackend")
+    def test_get_search_backend_uses_setting(self):
+        self.assertIsInstance(get_search_backend(), SimpleSearchBackend)
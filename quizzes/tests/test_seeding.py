@@ -0,0 +1,117 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from quizzes.models import (
+    Category,
+    PersonalBest,
+    Question,
+    Quiz,
+    QuizStats,
+    Score,
+)
+from quizzes.search import get_search_backend
+
+
+class TestSeedQuizzesCommand(TestCase):
+    def setUp(self):
+        Category.objects.create(title="None", slug="any")
+
+    def seed(self, **options):
+        options = {
+            "users": 5,
+            "quizzes": 8,
+            "scores": 200,
+            "min_questions": 2,
+            "max_questions": 4,
+            "chunk_size": 3,
+            "seed": 1,
+            **options,
+        }
+        call_command("seed_quizzes", stdout=StringIO(), **options)
+
+    def test_creates_users_with_profiles(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(profile__isnull=False).count(), 5)
+
+    def test_creates_quizzes_with_questions_and_answers(self):
+        self.seed()
+        self.assertEqual(Quiz.objects.count(), 8)
+        for quiz in Quiz.objects.annotate(count=Count("questions")):
+            self.assertEqual(quiz.question_count, quiz.count)
+            self.assertIn(quiz.question_count, range(2, 5))
+        for question in Question.objects.all():
+            self.assertEqual(question.answers.count(), 4)
+            self.assertEqual(question.answers.filter(is_correct=True).count(), 1)
+
+    def test_creates_scores_and_matching_quiz_stats(self):
+        self.seed()
+        self.assertEqual(Score.objects.count(), 200)
+        self.assertEqual(QuizStats.objects.count(), 8)
+        for stats in QuizStats.objects.all():
+            expected = QuizStats.recompute(stats.quiz_id)
+            self.assertEqual(stats.attempts, expected.attempts)
+            self.assertEqual(stats.percentage_sum, expected.percentage_sum)
+            self.assertEqual(stats.histogram, expected.histogram)
+
+    def test_creates_matching_personal_bests(self):
+        self.seed()
+        pairs = Score.objects.values_list("user_id", "quiz_id").distinct()
+        self.assertEqual(PersonalBest.objects.count(), len(pairs))
+        for personal_best in PersonalBest.objects.all():
+            scores = Score.objects.filter(
+                user_id=personal_best.user_id, quiz_id=personal_best.quiz_id
+            )
+            self.assertEqual(personal_best.attempts, scores.count())
+            self.assertEqual(
+                personal_best.best_percentage,
+                max(scores.values_list("percentage", flat=True)),
+            )
+            self.assertEqual(
+                personal_best.last_percentage, scores.latest("pk").percentage
+            )
+
+    def test_spreads_likes_by_popularity(self):
+        self.seed(likes=1000, popularity_skew=2)
+        likes = sorted(Quiz.objects.values_list("likes", flat=True), reverse=True)
+        self.assertGreater(likes[0], likes[-1])
+        self.assertAlmostEqual(sum(likes), 1000, delta=8)
+
+    def test_keeps_percentages_within_bounds(self):
+        self.seed(score_mean=90, score_stddev=50)
+        self.assertFalse(Score.objects.filter(percentage__gt=100).exists())
+        self.assertFalse(Score.objects.filter(percentage__lt=0).exists())
+
+    def test_adds_quizzes_to_search_index(self):
+        self.seed()
+        self.assertEqual(len(get_search_backend().search("seed quiz")), 8)
+
+    def test_is_deterministic_for_a_seed(self):
+        self.seed()
+        first = list(Score.objects.order_by("pk").values_list("percentage", flat=True))
+        Score.objects.all().delete()
+        self.seed(prefix="other")
+        second = list(Score.objects.order_by("pk").values_list("percentage", flat=True))
+        self.assertEqual(first, second)
+
+    def test_raises_error_when_prefix_is_used(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_raises_error_when_range_of_questions_is_invalid(self):
+        with self.assertRaises(CommandError):
+            self.seed(min_questions=5, max_questions=3)
+
+    def test_number_of_queries_does_not_depend_on_number_of_scores(self):
+        numbers_of_queries = []
+        for number_of_scores, prefix in [(10, "small"), (500, "big")]:
+            with CaptureQueriesContext(connection) as context:
+                self.seed(scores=number_of_scores, chunk_size=1000, prefix=prefix)
+            numbers_of_queries.append(len(context.captured_queries))
+        self.assertEqual(numbers_of_queries[0], numbers_of_queries[1])
@@ -0,0 +1,352 @@
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
+from os import path
+from shutil import rmtree
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from common import thumbnails
+from common.thumbnails import (
+    create_executor,
+    generate_thumbnails,
+    generate_thumbnails_on_commit,
+    get_thumbnail_url,
+    prefetch_thumbnail_urls,
+)
+from quizzes.models import Question, Quiz
+from quizzes.tests.utils import FormSetTestMixin, QuizzesUtilsMixin
+
+
+def create_image_file(name, size=(600, 400)):
+    content = BytesIO()
+    Image.new("RGB", size, "red").save(content, "JPEG")
+    return SimpleUploadedFile(name, content.getvalue(), content_type="image/jpeg")
+
+
+class ThumbnailsTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(rmtree, self.media_root)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        for name in ["default-quiz.jpg", "default-profile.jpg"]:
+            Image.new("RGB", (600, 400), "blue").save(path.join(self.media_root, name))
+
+    def assertThumbnailExists(self, name):
+        self.assertTrue(path.exists(path.join(self.media_root, name)), name)
+
+
+class TestGenerateThumbnails(ThumbnailsTestMixin, QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+        cls.executor = create_executor(1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.quiz = self.create_quiz()
+        self.quiz.thumbnail.save("quiz.jpg", create_image_file("quiz.jpg"))
+
+    def test_generates_thumbnails_of_field_aliases(self):
+        profile = self.user.profile
+        profile.photo.save("photo.jpg", create_image_file("photo.jpg"))
+
+        generated = generate_thumbnails(
+            [self.quiz.thumbnail, profile.photo], self.executor
+        )
+
+        self.assertEqual(generated, 3)
+        self.assertThumbnailExists("quiz_thumbnails/quiz.jpg.300x170_q85_crop.jpg")
+        self.assertThumbnailExists("profile_photos/photo.jpg.70x70_q85_crop.jpg")
+        self.assertThumbnailExists("profile_photos/photo.jpg.40x40_q85_crop.jpg")
+
+    def test_skips_existing_thumbnails(self):
+        generate_thumbnails([self.quiz.thumbnail], self.executor)
+        self.assertEqual(generate_thumbnails([self.quiz.thumbnail], self.executor), 0)
+
+    def test_resizes_shared_images_once(self):
+        other_quiz = self.create_quiz(title="Other quiz")
+        other_quiz.thumbnail = self.quiz.thumbnail.name
+        self.assertEqual(
+            generate_thumbnails(
+                [self.quiz.thumbnail, other_quiz.thumbnail], self.executor
+            ),
+            1,
+        )
+
+    def test_skips_empty_images(self):
+        question = self.create_question()
+        self.assertEqual(generate_thumbnails([question.image], self.executor), 0)
+
+    def test_logs_images_which_cannot_be_resized(self):
+        self.user.profile.photo.save(
+            "photo.jpg", SimpleUploadedFile("photo.jpg", b"not an image")
+        )
+        with self.assertLogs("common.thumbnails", "ERROR"):
+            generated = generate_thumbnails(
+                [self.user.profile.photo, self.quiz.thumbnail], self.executor
+            )
+        self.assertEqual(generated, 1)
+
+    def call_command(self, **options):
+        out = StringIO()
+        call_command(
+            "generate_thumbnails",
+            workers=1,
+            checkpoint=self.checkpoint,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    @property
+    def checkpoint(self):
+        return path.join(self.media_root, "checkpoint.json")
+
+    def test_command_generates_thumbnails_of_all_images(self):
+        question = self.create_question()
+        question.image.save("question.jpg", create_image_file("question.jpg"))
+        self.user.profile.photo.save("photo.jpg", create_image_file("photo.jpg"))
+
+        out = self.call_command()
+
+        self.assertIn("Generated 4 thumbnails of 3 images in", out)
+        self.assertThumbnailExists("questions_images/question.jpg.300x170_q85_crop.jpg")
+        self.assertFalse(path.exists(self.checkpoint))
+
+    def test_command_resumes_from_checkpoint(self):
+        other_quiz = self.create_quiz(title="Other quiz")
+        other_quiz.thumbnail.save("other.jpg", create_image_file("other.jpg"))
+        with open(self.checkpoint, "w") as f:
+            json.dump({"quizzes.Quiz.thumbnail": self.quiz.pk}, f)
+
+        out = self.call_command(chunk_size=1)
+
+        self.assertIn("Generated 3 thumbnails of 2 images in", out)
+        self.assertThumbnailExists("quiz_thumbnails/other.jpg.300x170_q85_crop.jpg")
+        self.assertFalse(
+            path.exists(
+                path.join(
+                    self.media_root, "quiz_thumbnails/quiz.jpg.300x170_q85_crop.jpg"
+                )
+            )
+        )
+
+    def test_command_saves_checkpoint_after_every_chunk(self):
+        self.create_quiz(title="Other quiz")
+        with mock.patch(
+            "quizzes.management.commands.generate_thumbnails.generate_thumbnails",
+            side_effect=[1, KeyboardInterrupt],
+        ):
+            out = self.call_command(chunk_size=1)
+
+        self.assertIn("Interrupted", out)
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f), {"quizzes.Quiz.thumbnail": self.quiz.pk})
+
+    def test_command_saves_checkpoint_in_media_root_by_default(self):
+        self.create_quiz(title="Other quiz")
+        with mock.patch(
+            "quizzes.management.commands.generate_thumbnails.generate_thumbnails",
+            side_effect=[1, KeyboardInterrupt],
+        ):
+            call_command(
+                "generate_thumbnails", workers=1, chunk_size=1, stdout=StringIO()
+            )
+
+        self.assertTrue(
+            path.exists(path.join(self.media_root, "thumbnails-checkpoint.json"))
+        )
+
+    def test_command_regenerates_existing_thumbnails_when_forced(self):
+        self.call_command()
+        self.assertIn("Generated 0 thumbnails", self.call_command())
+        self.assertIn("Generated 3 thumbnails", self.call_command(force=True))
+
+    def test_schedules_generation_after_commit(self):
+        with mock.patch.object(transaction, "on_commit") as on_commit:
+            generate_thumbnails_on_commit([self.quiz.thumbnail])
+            generate_thumbnails_on_commit([self.create_question().image])
+        on_commit.assert_called_once()
+
+
+@mock.patch("quizzes.forms.generate_thumbnails_on_commit")
+class TestThumbnailsOfUploads(
+    ThumbnailsTestMixin, QuizzesUtilsMixin, FormSetTestMixin, TestCase
+):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+
+    def test_generates_thumbnails_of_uploaded_quiz_thumbnail(self, generate):
+        self.post_create_view_with_one_question_quiz(
+            thumbnail=create_image_file("quiz.jpg")
+        )
+        (fieldfiles,), _ = generate.call_args_list[0]
+        self.assertEqual(
+            [fieldfile.name for fieldfile in fieldfiles], ["quiz_thumbnails/quiz.jpg"]
+        )
+
+    def test_generates_thumbnails_of_uploaded_question_images(self, generate):
+        self.post_create_view_with_one_question_quiz(
+            question_0_img=create_image_file("question.jpg")
+        )
+        generated = [
+            [fieldfile.name for fieldfile in fieldfiles]
+            for (fieldfiles,), _ in generate.call_args_list
+        ]
+        self.assertIn(["questions_images/question.jpg"], generated)
+
+    def test_does_not_generate_thumbnails_without_uploads(self, generate):
+        self.post_create_view_with_one_question_quiz()
+        for (fieldfiles,), _ in generate.call_args_list:
+            self.assertEqual(fieldfiles, [])
+
+
+class TestThumbnailUrls(ThumbnailsTestMixin, QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        super().setUp()
+        self.cache = caches[settings.THUMBNAIL_URL_CACHE]
+        self.cache.clear()
+        self.quiz = self.create_quiz()
+        self.quiz.thumbnail.save("quiz.jpg", create_image_file("quiz.jpg"))
+        self.thumbnail_url = "/media/quiz_thumbnails/quiz.jpg.300x170_q85_crop.jpg"
+
+    def get_thumbnail(self):
+        return Quiz.objects.get(pk=self.quiz.pk).thumbnail
+
+    def test_returns_thumbnail_url(self):
+        self.assertEqual(
+            get_thumbnail_url(self.quiz.thumbnail, "quiz_thumbnail"),
+            self.thumbnail_url,
+        )
+
+    def test_caches_thumbnail_url(self):
+        get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        with mock.patch.object(thumbnails, "resolve_thumbnail_url") as resolve:
+            url = get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        resolve.assert_not_called()
+        self.assertEqual(url, self.thumbnail_url)
+
+    def test_resolves_url_again_when_source_is_replaced(self):
+        get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        self.quiz.thumbnail.save("quiz.jpg", create_image_file("quiz.jpg"))
+        self.assertNotEqual(self.quiz.thumbnail.name, "quiz_thumbnails/quiz.jpg")
+        with mock.patch.object(
+            thumbnails, "resolve_thumbnail_url", return_value="new-url"
+        ):
+            url = get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        self.assertEqual(url, "new-url")
+
+    def test_does_not_look_up_source_in_storage(self):
+        get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        thumbnail = self.get_thumbnail()
+        with mock.patch.object(thumbnail.storage, "get_modified_time") as modified:
+            get_thumbnail_url(thumbnail, "quiz_thumbnail")
+        modified.assert_not_called()
+
+    def test_resolves_url_again_when_default_image_is_replaced(self):
+        self.quiz.thumbnail = "default-quiz.jpg"
+        self.quiz.save()
+        get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        default_path = path.join(self.media_root, "default-quiz.jpg")
+        Image.new("RGB", (600, 400), "green").save(default_path)
+        os.utime(default_path, (0, 0))
+        with mock.patch.object(
+            thumbnails, "resolve_thumbnail_url", return_value="new-url"
+        ):
+            url = get_thumbnail_url(self.get_thumbnail(), "quiz_thumbnail")
+        self.assertEqual(url, "new-url")
+
+    def test_looks_up_shared_default_image_once(self):
+        quizzes = [self.create_quiz(title=f"Quiz {i}") for i in range(3)]
+        get_thumbnail_url(quizzes[0].thumbnail, "quiz_thumbnail")
+        defaults = [
+            quiz.thumbnail
+            for quiz in Quiz.objects.filter(pk__in=[q.pk for q in quizzes])
+        ]
+        storage = defaults[0].storage
+        with mock.patch.object(
+            storage, "get_modified_time", wraps=storage.get_modified_time
+        ) as modified:
+            prefetch_thumbnail_urls(defaults, "quiz_thumbnail")
+
+        modified.assert_called_once()
+        urls = {default.thumbnail_urls["quiz_thumbnail"] for default in defaults}
+        self.assertEqual(len(urls), 1)
+        self.assertTrue(urls.pop())
+
+    def test_does_not_cache_url_of_missing_source(self):
+        self.quiz.thumbnail.name = "quiz_thumbnails/missing.jpg"
+        self.assertEqual(get_thumbnail_url(self.quiz.thumbnail, "quiz_thumbnail"), "")
+        self.assertEqual(self.cache._cache, {})
+
+    def test_prefetches_urls_with_one_cache_lookup(self):
+        quizzes = [self.quiz]
+        for i in range(3):
+            quiz = self.create_quiz(title=f"Quiz {i}")
+            quiz.thumbnail.save(f"quiz{i}.jpg", create_image_file(f"quiz{i}.jpg"))
+            quizzes.append(quiz)
+        prefetch_thumbnail_urls([quiz.thumbnail for quiz in quizzes], "quiz_thumbnail")
+        quizzes = list(Quiz.objects.order_by("pk"))
+
+        with mock.patch.object(
+            self.cache, "get_many", wraps=self.cache.get_many
+        ) as get_many:
+            prefetch_thumbnail_urls(
+                [quiz.thumbnail for quiz in quizzes], "quiz_thumbnail"
+            )
+            urls = [
+                get_thumbnail_url(quiz.thumbnail, "quiz_thumbnail") for quiz in quizzes
+            ]
+
+        get_many.assert_called_once()
+        self.assertEqual(urls[0], self.thumbnail_url)
+        self.assertEqual(len(set(urls)), 4)
+
+    def test_take_page_looks_up_question_image_urls_at_once(self):
+        for i in range(3):
+            question = self.create_question(question_body=f"Question {i}")
+            question.image.save(f"q{i}.jpg", create_image_file(f"q{i}.jpg"))
+
+        with mock.patch.object(
+            self.cache, "get_many", wraps=self.cache.get_many
+        ) as get_many:
+            response = self.client.get(reverse("quizzes:take", args=[self.quiz.slug]))
+
+        get_many.assert_called_once()
+        for i in range(3):
+            self.assertContains(
+                response, f"/media/questions_images/q{i}.jpg.300x170_q85_crop.jpg"
+            )
@@ -1,11 +1,17 @@
 import datetime
+import json
+from base64 import urlsafe_b64encode
 from os import path
 from shutil import rmtree
 from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 from quizzes.forms import (
     ALL_ANSWERS_INCORRECT_ERROR,
@@ -14,8 +20,15 @@ from quizzes.forms import (
     TOO_LONG_WORD_ERROR,
     FilterSortQuizzesForm,
 )
-from quizzes.models import Question, Quiz, Score
-from quizzes.tests.utils import FormSetTestMixin, QuizzesUtilsMixin
+from quizzes.likes import flush_likes
+from quizzes.models import Answer, Question, Quiz, QuizStats, Score
+from quizzes.scores import wait_for_pending_scores
+from quizzes.search import get_search_backend
+from quizzes.tests.utils import (
+    FormSetTestMixin,
+    QuizzesUtilsMixin,
+    get_question_formset_data,
+)
 from quizzes.views import (
     QUIZ_CREATE_SUCCESS_MESSAGE,
     QUIZ_DELETE_SUCCESS_MESSAGE,
@@ -23,6 +36,10 @@ from quizzes.views import (
 )
 
 
+def encode_cursor(data):
+    return urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
 class TestCreateQuizView(QuizzesUtilsMixin, FormSetTestMixin, TestCase):
     dummy_media_files_dir = settings.BASE_DIR / "quizzes" / "tests" / "test_media"
 
@@ -234,6 +251,70 @@ class TestUpdateQuizView(QuizzesUtilsMixin, FormSetTestMixin, TestCase):
         self.assertTrue(self.quiz.questions.filter(question="New Question").exists())
         self.assertTrue(self.question.answers.filter(answer="New A").exists())
 
+    def get_unchanged_update_quiz_form_data(self):
+        data = get_question_formset_data(self.quiz)
+        data.update(
+            {
+                "title": self.quiz.title,
+                "description": self.quiz.description,
+                "category": self.category.pk,
+                "thumbnail": "",
+            }
+        )
+        return data
+
+    def test_update_executes_the_same_number_of_queries_regardless_of_quiz_size(
+        self,
+    ):
+        for number_of_questions in (1, 10):
+            self.quiz.delete()
+            self.quiz = self.create_quiz()
+            self.add_questions_to_quiz(number_of_questions)
+            self.client.post(
+                self.get_update_quiz_url(self.quiz.slug),
+                data=self.get_unchanged_update_quiz_form_data(),
+            )
+            data = self.get_unchanged_update_quiz_form_data()
+            data["questions-0-question"] = "Fixed question"
+
+            with self.assertNumQueries(16):
+                self.client.post(self.get_update_quiz_url(self.quiz.slug), data=data)
+
+    def test_update_writes_only_changed_rows(self):
+        self.add_questions_to_quiz(3)
+        url = self.get_update_quiz_url(self.QUIZ_SLUG)
+        self.client.post(url, data=self.get_unchanged_update_quiz_form_data())
+        data = self.get_unchanged_update_quiz_form_data()
+        data["questions-1-answers-2-answer"] = "Fixed answer"
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.post(url, data=data)
+
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"quizzes_answer"', updates[0])
+        self.assertTrue(
+            Answer.objects.filter(
+                question__quiz=self.quiz, answer="Fixed answer"
+            ).exists()
+        )
+
+    def test_update_is_rolled_back_when_saving_answers_fails(self):
+        data = self.get_example_update_quiz_form_data(self.quiz)
+        with patch.object(
+            Answer.objects, "bulk_update", side_effect=DatabaseError
+        ), self.assertRaises(DatabaseError):
+            self.client.post(self.get_update_quiz_url(self.QUIZ_SLUG), data=data)
+
+        self.quiz.refresh_from_db()
+        self.question.refresh_from_db()
+        self.assertEqual(self.quiz.title, self.QUIZ_TITLE)
+        self.assertEqual(self.question.question, self.QUESTION_BODY)
+
     def test_redirects_to_profile_page_when_quiz_is_updated_successfully(self):
         data = self.get_example_update_quiz_form_data(self.quiz)
         response = self.client.post(
@@ -364,6 +445,14 @@ class TestUpdateQuizView(QuizzesUtilsMixin, FormSetTestMixin, TestCase):
             response.context["questions_formset"], number_of_questions
         )
 
+    def test_clears_answer_key_when_quiz_is_updated(self):
+        self.quiz.get_answer_key()
+        data = self.get_example_update_quiz_form_data(self.quiz)
+        data["questions-0-answers-0-is_correct"] = "on"
+        self.client.post(self.get_update_quiz_url(self.QUIZ_SLUG), data=data)
+        answer_a = self.question.answers.get(answer="New A")
+        self.assertIn(answer_a.pk, self.quiz.get_answer_key()[self.question.pk])
+
     def test_deletes_question(self):
         self.add_questions_to_quiz(n=1)
         self.quiz.refresh_from_db()
@@ -457,6 +546,20 @@ class TestTakeQuizView(QuizzesUtilsMixin, FormSetTestMixin, TestCase):
         )
         self.assertContains(response, "Congratulations! You got 100% (1/1)")
 
+    def test_grades_with_answers_edited_outside_the_views(self):
+        self.client.post(
+            self.get_take_quiz_url(self.QUIZ_SLUG), data=self.get_form_data()
+        )
+        for answer in self.question.answers.all():
+            answer.is_correct = answer.answer == "A"
+            answer.save()
+
+        response = self.client.post(
+            self.get_take_quiz_url(self.QUIZ_SLUG),
+            data=self.get_form_data(is_correct=False),
+        )
+        self.assertContains(response, "Congratulations! You got 100% (1/1)")
+
     def test_displays_score_when_answers_are_incorrect(self):
         response = self.client.post(
             self.get_take_quiz_url(self.QUIZ_SLUG),
@@ -469,12 +572,50 @@ class TestTakeQuizView(QuizzesUtilsMixin, FormSetTestMixin, TestCase):
         response = self.client.post(self.get_take_quiz_url(self.QUIZ_SLUG), data=data)
         self.assertContains(response, "Congratulations! You got 0% (0/1)")
 
+    def test_displays_percentile_rank_among_previous_attempts(self):
+        user2 = self.create_user(username="User2", email="user2@gmail.com")
+        self.create_scores(self.quiz, user2, [0, 0, 100, 100])
+        response = self.client.post(
+            self.get_take_quiz_url(self.QUIZ_SLUG), data=self.get_form_data()
+        )
+        self.assertEqual(response.context["percentile_rank"], 50)
+        self.assertContains(response, "You beat 50% of all attempts at this quiz.")
+
+    def test_displays_first_taker_message_when_quiz_has_no_attempts(self):
+        response = self.client.post(
+            self.get_take_quiz_url(self.QUIZ_SLUG), data=self.get_form_data()
+        )
+        self.assertContains(response, "This is the first attempt at this quiz!")
+
     def test_creates_score_if_user_is_logged(self):
         self.client.post(
             self.get_take_quiz_url(self.QUIZ_SLUG), data=self.get_form_data()
         )
         self.assertTrue(Score.objects.filter(user=self.user, quiz=self.quiz).exists())
 
+    def test_number_of_queries_does_not_depend_on_number_of_questions(self):
+        for number_of_questions in range(1, 21):
+            with self.subTest(number_of_questions=number_of_questions):
+                quiz = self.create_quiz(title=f"Quiz {number_of_questions}")
+                self.add_questions_to_quiz(number_of_questions, quiz=quiz)
+                data = {
+                    "form-TOTAL_FORMS": number_of_questions,
+                    "form-INITIAL_FORMS": 0,
+                }
+                for i, question in enumerate(quiz.questions.all()):
+                    data[f"form-{i}-answer"] = question.answers.all()[3].pk
+
+                with self.assertNumQueries(5):
+                    self.client.get(self.get_take_quiz_url(quiz.slug))
+                with self.assertNumQueries(18):
+                    response = self.client.post(
+                        self.get_take_quiz_url(quiz.slug), data=data
+                    )
+                self.assertContains(
+                    response,
+                    f"You got 100% ({number_of_questions}/{number_of_questions})",
+                )
+
     def test_is_liked_is_context_when_displays_score(self):
         response = self.client.post(
             self.get_take_quiz_url(self.QUIZ_SLUG), self.get_form_data()
@@ -629,6 +770,134 @@ class TestQuizzesListView(QuizzesUtilsMixin, TestCase):
         response = self.client.get(self.get_list_url(sorting="-likes"))
         self.assertQuerysetEqual(response.context["quizzes"], expected)
 
+    def test_search(self):
+        get_search_backend().index_quiz(self.quiz1)
+        get_search_backend().index_quiz(self.quiz2)
+        response = self.client.get(f"{self.get_list_url()}&search=quiz1")
+        self.assertQuerysetEqual(response.context["quizzes"], [repr(self.quiz1)])
+        self.assertEqual(response.context["search"], "quiz1")
+
+    def test_displays_appropriate_message_when_no_quizzes_match_search(self):
+        response = self.client.get(f"{self.get_list_url()}&search=nothing")
+        self.assertContains(response, "There are no quizzes that matches your filters.")
+
+    def test_quiz_cards_are_cached(self):
+        self.client.get(self.get_list_url())
+        Quiz.objects.filter(pk=self.quiz1.pk).update(title="Changed title")
+        response = self.client.get(self.get_list_url())
+        self.assertNotContains(response, "Changed title")
+
+    def test_quiz_card_cache_is_cleared_when_quiz_is_saved(self):
+        self.client.get(self.get_list_url())
+        self.quiz1.title = "Changed title"
+        self.quiz1.save()
+        response = self.client.get(self.get_list_url())
+        self.assertContains(response, "Changed title")
+
+    def get_all_pages_with_cursor(self, sorting=""):
+        quizzes = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get(
+                self.get_list_url(sorting=sorting, cursor=cursor)
+            )
+            quizzes.extend(response.context["quizzes"])
+            cursor = response.context["page_obj"].next_cursor
+        return quizzes
+
+    @patch("quizzes.views.QuizzesListView.paginate_by", 1)
+    def test_cursor_pagination(self):
+        self.quiz2.likes = 3
+        self.quiz2.save()
+        self.create_scores(quiz=self.quiz3, user=self.user1, scores=[50])
+        self.create_question(quiz=self.quiz1, question_body="question")
+        self.create_question(quiz=self.quiz1, question_body="question")
+        self.create_question(quiz=self.quiz2, question_body="question")
+
+        for sorting in [
+            "",
+            "created",
+            "-created",
+            "avg_score",
+            "-avg_score",
+            "length",
+            "-length",
+            "likes",
+            "-likes",
+        ]:
+            with self.subTest(sorting=sorting):
+                response = self.client.get(self.get_list_url(sorting=sorting))
+                expected = list(response.context["paginator"].object_list)
+                self.assertEqual(self.get_all_pages_with_cursor(sorting), expected)
+
+    def test_cursor_pagination_breaks_ties_by_id(self):
+        expected = [self.quiz1, self.quiz2, self.quiz3]
+        with patch("quizzes.views.QuizzesListView.paginate_by", 1):
+            self.assertEqual(self.get_all_pages_with_cursor("likes"), expected)
+            self.assertEqual(self.get_all_pages_with_cursor("-likes"), expected[::-1])
+
+    def test_cursor_pagination_does_not_count_quizzes(self):
+        response = self.client.get(self.get_list_url(cursor=""))
+        self.assertFalse(response.context["is_paginated"])
+        with self.assertNumQueries(2):
+            # the quizzes page and the categories of the filter form
+            self.client.get(self.get_list_url(sorting="-likes", cursor=""))
+
+    @patch("quizzes.views.QuizzesListView.paginate_by", 1)
+    def test_cursor_pagination_keeps_ranking_of_search_results(self):
+        Quiz.objects.filter(pk=self.quiz1.pk).update(description="About alpha")
+        Quiz.objects.filter(pk=self.quiz3.pk).update(title="Alpha")
+        for quiz in Quiz.objects.all():
+            get_search_backend().index_quiz(quiz)
+
+        url = f"{self.get_list_url(cursor='')}&search=alpha"
+        response = self.client.get(url)
+        self.assertFalse(response.context["cursor_pagination"])
+        self.assertEqual(
+            list(response.context["paginator"].object_list), [self.quiz3, self.quiz1]
+        )
+        response = self.client.get(url.replace("page=", "page=2"))
+        self.assertQuerysetEqual(response.context["quizzes"], [repr(self.quiz1)])
+
+    @patch("quizzes.views.QuizzesListView.paginate_by", 1)
+    def test_cursor_pagination_links_back_to_first_page(self):
+        response = self.client.get(self.get_list_url(cursor=""))
+        next_cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(self.get_list_url(cursor=next_cursor))
+        self.assertContains(response, "First")
+        self.assertNotContains(response, "&laquo;")
+
+    def test_cursor_pagination_returns_404_when_cursor_is_invalid(self):
+        response = self.client.get(self.get_list_url(cursor="invalid"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_pagination_returns_404_when_cursor_is_malformed(self):
+        likes_cursor = encode_cursor([3, self.quiz1.pk])
+        for sorting, cursor in [
+            ("likes", encode_cursor({"a": 1})),
+            ("likes", encode_cursor([{"a": 1}, 1])),
+            ("likes", encode_cursor(["x", "abc"])),
+            ("likes", encode_cursor([None, 1])),
+            ("likes", encode_cursor([1, 2, 3])),
+            ("likes", encode_cursor([1, True])),
+            ("likes", encode_cursor(["x", 1])),
+            ("likes", encode_cursor([1, 2 ** 70])),
+            ("", encode_cursor([None, "1"])),
+            ("avg_score", encode_cursor([[1], 1])),
+            ("created", likes_cursor),
+            ("-created", encode_cursor(["2021-02-30", 1])),
+        ]:
+            with self.subTest(sorting=sorting, cursor=cursor):
+                response = self.client.get(
+                    self.get_list_url(sorting=sorting, cursor=cursor)
+                )
+                self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            self.get_list_url(sorting="likes", cursor=likes_cursor)
+        )
+        self.assertEqual(response.status_code, 200)
+
 
 class TestQuizDetailView(QuizzesUtilsMixin, TestCase):
     @classmethod
@@ -645,6 +914,48 @@ class TestQuizDetailView(QuizzesUtilsMixin, TestCase):
         response = self.client.get(self.get_quiz_detail_url("does-not-exist"))
         self.assertEqual(response.status_code, 404)
 
+    def test_displays_leaderboard(self):
+        user2 = self.create_user(username="User2", email="user2@gmail.com")
+        self.create_scores(self.quiz, self.user, [40])
+        self.create_scores(self.quiz, user2, [90])
+
+        response = self.client.get(self.get_quiz_detail_url(self.QUIZ_SLUG))
+
+        self.assertEqual(
+            [pb.user for _, pb in response.context["leaderboard"]], [user2, self.user]
+        )
+        self.assertContains(response, "90%")
+
+    def test_number_of_queries_does_not_depend_on_size_of_leaderboard(self):
+        for i in range(5):
+            user = self.create_user(username=f"User{i}", email=f"user{i}@gmail.com")
+            self.create_scores(self.quiz, user, [i])
+            with self.subTest(users=i + 1), self.assertNumQueries(2):
+                self.client.get(self.get_quiz_detail_url(self.QUIZ_SLUG))
+
+    def test_leaderboard_json(self):
+        self.create_scores(self.quiz, self.user, [40, 80])
+        response = self.client.get(
+            reverse("quizzes:leaderboard", args=[self.QUIZ_SLUG])
+        )
+        self.assertEqual(
+            response.json()["leaderboard"],
+            [
+                {
+                    "rank": 1,
+                    "username": self.USERNAME,
+                    "best_percentage": 80,
+                    "attempts": 2,
+                }
+            ],
+        )
+
+    def test_leaderboard_json_returns_404_when_quiz_does_not_exist(self):
+        response = self.client.get(
+            reverse("quizzes:leaderboard", args=["does-not-exist"])
+        )
+        self.assertEqual(response.status_code, 404)
+
     def test_displays_data_for_given_quiz(self):
         response = self.client.get(self.get_quiz_detail_url(self.QUIZ_SLUG))
         self.assertContains(response, self.category.title)
@@ -654,6 +965,7 @@ class TestQuizDetailView(QuizzesUtilsMixin, TestCase):
 
 class TestLikeQuizView(QuizzesUtilsMixin, TestCase):
     def setUp(self):
+        cache.clear()
         self.category = self.create_category()
         self.user = self.create_user()
         self.quiz = self.create_quiz()
@@ -669,6 +981,7 @@ class TestLikeQuizView(QuizzesUtilsMixin, TestCase):
     def test_like_if_quiz_is_unliked(self):
         quiz_likes = self.quiz.likes
         self.post_ajax_request(path=self.get_like_quiz_url(self.QUIZ_SLUG))
+        flush_likes()
         self.quiz.refresh_from_db()
         self.assertEqual(self.quiz.likes, quiz_likes + 1)
         self.assertTrue(self.client.session[self.quiz.get_session_like_str()])
@@ -685,7 +998,72 @@ class TestLikeQuizView(QuizzesUtilsMixin, TestCase):
         self.assertTrue(self.client.session[self.quiz.get_session_like_str()])
 
 
+class TestTakeQuizAsyncView(QuizzesUtilsMixin, TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = self.create_category()
+        self.user = self.create_user()
+        self.quiz = self.create_quiz()
+        self.question = self.create_question()
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+        self.url = reverse("quizzes:take_async", args=[self.QUIZ_SLUG])
+
+    def tearDown(self):
+        wait_for_pending_scores()
+
+    def get_form_data(self):
+        return {
+            "form-TOTAL_FORMS": 1,
+            "form-INITIAL_FORMS": 0,
+            "form-0-answer": self.question.answers.all()[3].pk,
+        }
+
+    def test_displays_score(self):
+        response = self.client.post(self.url, data=self.get_form_data())
+        self.assertContains(response, "Congratulations! You got 100% (1/1)")
+
+    def test_saves_score_in_background(self):
+        self.client.post(self.url, data=self.get_form_data())
+        wait_for_pending_scores()
+
+        score = Score.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(score.percentage, 100)
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).attempts, 1)
+
+    def test_does_not_save_score_of_anonymous_user(self):
+        self.client.logout()
+        self.client.post(self.url, data=self.get_form_data())
+        wait_for_pending_scores()
+        self.assertFalse(Score.objects.exists())
+
+    def test_returns_405_for_get_request(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_returns_404_when_quiz_with_given_slug_does_not_exists(self):
+        url = reverse("quizzes:take_async", args=["does-not-exist"])
+        response = self.client.post(url, data=self.get_form_data())
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ASYNC_QUIZ_SUBMISSION=True)
+    def test_take_page_submits_to_async_view_when_enabled(self):
+        response = self.client.get(self.get_take_quiz_url(self.QUIZ_SLUG))
+        self.assertContains(response, f'action="{self.url}"')
+
+    def test_like(self):
+        url = reverse("quizzes:like_async", args=[self.QUIZ_SLUG])
+        response = self.post_ajax_request(url)
+        flush_likes()
+
+        self.assertEqual(response.status_code, 200)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.likes, 1)
+
+
 class TestHomePageView(QuizzesUtilsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_renders_top_3_quizzes_by_likes(self):
         category = self.create_category()
         user = self.create_user()
@@ -706,6 +1084,34 @@ class TestHomePageView(QuizzesUtilsMixin, TestCase):
         self.assertQuerysetEqual(response.context["quizzes"], expected)
         self.assertContains(response, 'id="top-quizzes"')
 
+    def create_quizzes(self, n):
+        category = self.create_category()
+        user = self.create_user()
+        return [
+            self.create_quiz(title=f"quiz nr {i}", user=user, category=category)
+            for i in range(n)
+        ]
+
+    def test_top_quizzes_are_cached(self):
+        self.create_quizzes(3)
+        self.client.get(self.home_page_urg)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.home_page_urg)
+        self.assertEqual(len(response.context["quizzes"]), 3)
+
+    @override_settings(TOP_QUIZZES_NUMBER=2)
+    def test_renders_configured_number_of_top_quizzes(self):
+        self.create_quizzes(3)
+        response = self.client.get(self.home_page_urg)
+        self.assertEqual(len(response.context["quizzes"]), 2)
+
+    def test_top_quizzes_cache_is_cleared_when_quiz_is_deleted(self):
+        quizzes = self.create_quizzes(3)
+        self.client.get(self.home_page_urg)
+        quizzes[0].delete()
+        response = self.client.get(self.home_page_urg)
+        self.assertQuerysetEqual(response.context["quizzes"], "")
+
     def test_displays_nothing_when_number_of_quizzes_is_less_than_3(self):
         response = self.client.get(self.home_page_urg)
         self.assertQuerysetEqual(response.context["quizzes"], "")
@@ -717,3 +1123,135 @@ class TestHomePageView(QuizzesUtilsMixin, TestCase):
 
         self.assertQuerysetEqual(response.context["quizzes"], "")
         self.assertNotContains(response, 'id="top-quizzes"')
+
+
+class TestScoreHistoryView(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+        self.url = reverse("quizzes:history")
+
+    def create_attempted_quizzes(self, n, prefix="Quiz"):
+        quizzes = []
+        for i in range(n):
+            quiz = self.create_quiz(title=f"{prefix} {i}")
+            self.create_scores(quiz, self.user, [i, 50])
+            quizzes.append(quiz)
+        return quizzes
+
+    def test_redirects_anonymous_user_to_login_page(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f"{reverse('accounts:login')}?next={self.url}")
+
+    def test_lists_attempted_quizzes_from_last_attempted(self):
+        quizzes = self.create_attempted_quizzes(3)
+        self.create_scores(quizzes[0], self.user, [90])
+
+        response = self.client.get(self.url)
+
+        personal_bests = list(response.context["personal_bests"])
+        self.assertEqual(
+            [personal_best.quiz for personal_best in personal_bests],
+            [quizzes[0], quizzes[2], quizzes[1]],
+        )
+        self.assertEqual(personal_bests[0].attempts, 3)
+        self.assertContains(response, "90%")
+
+    def test_does_not_list_quizzes_of_other_users(self):
+        user2 = self.create_user(username="User2", email="user2@gmail.com")
+        self.create_scores(self.create_quiz(), user2, [50])
+        response = self.client.get(self.url)
+        self.assertContains(response, "You have not taken any quiz yet.")
+
+    def test_paginates_with_cursor(self):
+        self.create_attempted_quizzes(25)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context["personal_bests"]), 20)
+        cursor = response.context["page_obj"].next_cursor
+
+        response = self.client.get(self.url, {"cursor": cursor})
+        titles = [pb.quiz.title for pb in response.context["personal_bests"]]
+        self.assertEqual(titles, [f"Quiz {i}" for i in range(4, -1, -1)])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_cursor_returns_404(self):
+        for cursor in [
+            encode_cursor(["not a date", 1]),
+            encode_cursor([1, 1]),
+            encode_cursor([None, 1]),
+            encode_cursor(["2021-01-01T10:00:00", "1"]),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_json(self):
+        quiz = self.create_attempted_quizzes(1)[0]
+        response = self.client.get(self.url, {"format": "json"})
+        data = response.json()
+        self.assertIsNone(data["next_cursor"])
+        self.assertEqual(data["results"][0]["quiz"]["slug"], quiz.slug)
+        self.assertEqual(data["results"][0]["attempts"], 2)
+        self.assertEqual(data["results"][0]["best_percentage"], 50)
+
+    def test_number_of_queries_does_not_depend_on_number_of_quizzes(self):
+        for n in [1, 10]:
+            with self.subTest(n=n):
+                self.create_attempted_quizzes(n, prefix=f"Quiz {n}")
+                with self.assertNumQueries(3):
+                    self.client.get(self.url)
+
+
+class TestQuizScoreHistoryView(QuizzesUtilsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = cls.create_user()
+        cls.category = cls.create_category()
+
+    def setUp(self):
+        self.quiz = self.create_quiz()
+        self.client.login(username=self.USERNAME, password=self.PASSWORD)
+        self.url = reverse("quizzes:quiz_history", args=[self.QUIZ_SLUG])
+
+    def test_lists_scores_from_the_newest(self):
+        self.create_scores(self.quiz, self.user, [10, 30, 20])
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [score.percentage for score in response.context["scores"]], [20, 30, 10]
+        )
+        self.assertEqual(response.context["personal_best"].best_percentage, 30)
+
+    def test_paginates_with_cursor(self):
+        self.create_scores(self.quiz, self.user, range(25))
+        response = self.client.get(self.url)
+        cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual(
+            [score.percentage for score in response.context["scores"]],
+            [4, 3, 2, 1, 0],
+        )
+
+    def test_json(self):
+        self.create_scores(self.quiz, self.user, [10, 30])
+        data = self.client.get(self.url, {"format": "json"}).json()
+        self.assertEqual(data["personal_best"]["attempts"], 2)
+        self.assertEqual([score["percentage"] for score in data["results"]], [30, 10])
+
+    def test_json_of_not_attempted_quiz(self):
+        data = self.client.get(self.url, {"format": "json"}).json()
+        self.assertIsNone(data["personal_best"])
+        self.assertEqual(data["results"], [])
+
+    def test_returns_404_when_quiz_does_not_exist(self):
+        url = reverse("quizzes:quiz_history", args=["does-not-exist"])
+        self.assertEqual(self.client.get(url).status_code, 404)
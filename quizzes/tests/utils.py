@@ -1,3 +1,5 @@
+from urllib.parse import quote
+
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
@@ -5,6 +7,36 @@ from django.utils.text import slugify
 from quizzes.models import Answer, Category, Question, Quiz
 
 
+def get_question_formset_data(quiz, new_questions=0, deleted=(), prefix="New"):
+    questions = list(quiz.questions.all()) if quiz else []
+    data = {
+        "questions-TOTAL_FORMS": len(questions) + new_questions,
+        "questions-INITIAL_FORMS": len(questions),
+    }
+    for i in range(len(questions) + new_questions):
+        question = questions[i] if i < len(questions) else None
+        answers = list(question.answers.all()) if question else [None] * 4
+        data.update(
+            {
+                f"questions-{i}-question": f"{prefix} question {i}",
+                f"questions-{i}-answers-TOTAL_FORMS": 4,
+                f"questions-{i}-answers-INITIAL_FORMS": 4 if question else 0,
+                f"questions-{i}-answers-{i % 4}-is_correct": "on",
+            }
+        )
+        if question:
+            data[f"questions-{i}-id"] = question.pk
+            data[f"questions-{i}-quiz"] = quiz.pk
+        if i in deleted:
+            data[f"questions-{i}-DELETE"] = "on"
+        for j, answer in enumerate(answers):
+            data[f"questions-{i}-answers-{j}-answer"] = f"{prefix} {i}-{j}"
+            if answer:
+                data[f"questions-{i}-answers-{j}-id"] = answer.pk
+                data[f"questions-{i}-answers-{j}-question"] = question.pk
+    return data
+
+
 class FormSetTestMixin:
     def assertFormsetNumberOfFormsEqual(self, formset, expected):
         number_of_forms = len(formset.forms)
@@ -30,14 +62,19 @@ class QuizzesUtilsMixin:
         return reverse("quizzes:take", args=[slug])
 
     @staticmethod
-    def get_list_url(page="", author_username="", category_slug="", sorting=""):
-        return (
+    def get_list_url(
+        page="", author_username="", category_slug="", sorting="", cursor=None
+    ):
+        url = (
             f'{reverse("quizzes:list")}'
             f"?page={page}"
             f"&author={author_username}"
             f"&category={category_slug}"
             f"&sorting={sorting}"
         )
+        if cursor is not None:
+            url += f"&cursor={quote(cursor)}"
+        return url
 
     @staticmethod
     def get_quiz_detail_url(slug):
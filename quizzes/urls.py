@@ -13,7 +13,16 @@ urlpatterns = [
     ),
     path("delete/<slug:slug>/", views.DeleteQuizView.as_view(), name="delete"),
     path("take/<slug:slug>/", views.TakeQuizView.as_view(), name="take"),
+    path("take-async/<slug:slug>/", views.take_quiz_async_view, name="take_async"),
     path("list/", views.QuizzesListView.as_view(), name="list"),
     path("detail/<slug:slug>/", views.QuizDetailView.as_view(), name="detail"),
+    path("leaderboard/<slug:slug>/", views.leaderboard_view, name="leaderboard"),
     path("like/<slug:slug>/", views.like_quiz_view, name="like"),
+    path("like-async/<slug:slug>/", views.like_quiz_async_view, name="like_async"),
+    path("history/", views.ScoreHistoryView.as_view(), name="history"),
+    path(
+        "history/<slug:slug>/",
+        views.QuizScoreHistoryView.as_view(),
+        name="quiz_history",
+    ),
 ]
@@ -1,20 +1,28 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import AnonymousUser
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.db import connection, transaction
+from django.db.models import Case, Prefetch, When
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import DeleteView, DetailView, FormView, ListView
 from django.views.generic.base import TemplateView
 from django.views.generic.detail import SingleObjectMixin
 
+from common.pagination import CursorPaginator, InvalidCursor
+from common.thumbnails import prefetch_thumbnail_urls
 from quizzes.forms import (
     FilterSortQuizzesForm,
     QuizForm,
     create_question_formset,
     create_take_quiz_formset,
 )
-from quizzes.models import Quiz, Score
+from quizzes.models import Answer, PersonalBest, Question, Quiz
+from quizzes.scores import save_score_in_background, submit_score
+from quizzes.search import get_search_backend
 
 QUIZ_CREATE_SUCCESS_MESSAGE = "Your quiz has been created successfully"
 QUIZ_UPDATE_SUCCESS_MESSAGE = "Your quiz has been updated successfully"
@@ -59,8 +67,13 @@ class QuizWithQuestionsFormView(LoginRequiredMixin, TemplateView):
         )
 
     def forms_valid(self, quiz_form, questions_formset):
-        quiz = quiz_form.save(author=self.request.user)
-        questions_formset.save(quiz=quiz)
+        with transaction.atomic():
+            if quiz_form.instance.pk is None or quiz_form.has_changed():
+                quiz = quiz_form.save(author=self.request.user)
+            else:
+                quiz = quiz_form.instance
+            questions_formset.save(quiz=quiz)
+        quiz.clear_answer_key()
         messages.success(self.request, self.success_message)
         return redirect(self.success_url)
 
@@ -114,12 +127,13 @@ class UpdateQuizWithQuestionsView(
     success_url = reverse_lazy("accounts:profile")
     can_delete = True
     queryset = Quiz.objects.select_related("author", "category").prefetch_related(
-        "questions__answers"
+        Prefetch("questions", Question.objects.order_by("pk")),
+        Prefetch("questions__answers", Answer.objects.order_by("pk")),
     )
 
     def dispatch(self, request, *args, **kwargs):
-        self.default_number_of_questions = self.get_object().questions.count()
         self.object = self.get_object()
+        self.default_number_of_questions = len(self.object.questions.all())
         return super().dispatch(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
@@ -128,7 +142,7 @@ class UpdateQuizWithQuestionsView(
         return context
 
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.object.author == self.request.user
 
 
 class DeleteQuizView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
@@ -161,12 +175,11 @@ class TakeQuizView(SingleObjectMixin, FormView):
         score_percentage = self.calculate_score_percentage(
             score, self.get_number_of_questions()
         )
+        # The rank is computed from the stats loaded with the quiz, so it
+        # compares the score with the previous attempts in every saving mode.
+        percentile_rank = self.object.get_percentile_rank(score_percentage)
         if not isinstance(self.request.user, AnonymousUser):
-            Score.objects.create(
-                user=self.request.user,
-                quiz=self.get_object(),
-                percentage=score_percentage,
-            )
+            self.save_score(score_percentage)
         return render(
             self.request,
             "quizzes/quiz/score.html",
@@ -174,17 +187,32 @@ class TakeQuizView(SingleObjectMixin, FormView):
                 "quiz": self.object,
                 "score": score,
                 "score_percentage": score_percentage,
+                "percentile_rank": percentile_rank,
+                "number_of_questions": self.get_number_of_questions(),
                 "is_liked": self.object.is_liked(self.request.session),
+                "async_submission": settings.ASYNC_QUIZ_SUBMISSION,
             },
         )
 
+    def save_score(self, percentage):
+        submit_score(self.request.user.pk, self.get_object().pk, percentage)
+
+    def get_context_data(self, **kwargs):
+        prefetch_thumbnail_urls(
+            [question.image for question in self.get_object().questions.all()],
+            "question_image",
+        )
+        context = super().get_context_data(**kwargs)
+        context["async_submission"] = settings.ASYNC_QUIZ_SUBMISSION
+        return context
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["quiz"] = self.get_object()
         return kwargs
 
     def get_form_class(self):
-        return create_take_quiz_formset(self.get_object().questions.count())
+        return create_take_quiz_formset(self.get_number_of_questions())
 
     def get_object(self, queryset=None):
         if not self.object:
@@ -194,22 +222,15 @@ class TakeQuizView(SingleObjectMixin, FormView):
         return self.object
 
     def get_number_of_questions(self):
-        if self.number_of_questions:
-            return self.number_of_questions
-        else:
-            if self.object:
-                self.number_of_questions = self.object.questions.count()
-                return self.number_of_questions
-            else:
-                quiz = self.get_object()
-                self.number_of_questions = quiz.questions.count()
-                return self.number_of_questions
+        if self.number_of_questions is None:
+            self.number_of_questions = len(self.get_object().questions.all())
+        return self.number_of_questions
 
     def get_queryset(self):
         return (
             super()
             .get_queryset()
-            .select_related("author", "category")
+            .select_related("author", "category", "stats")
             .prefetch_related("questions__answers")
         )
 
@@ -218,6 +239,13 @@ class TakeQuizView(SingleObjectMixin, FormView):
         return int((score / number_of_questions) * 100)
 
 
+class BackgroundScoreTakeQuizView(TakeQuizView):
+    http_method_names = ["post"]
+
+    def save_score(self, percentage):
+        save_score_in_background(self.request.user.pk, self.get_object().pk, percentage)
+
+
 class QuizzesListView(ListView):
     model = Quiz
     template_name = "quizzes/quiz/list.html"
@@ -226,11 +254,21 @@ class QuizzesListView(ListView):
     author_username = None
     category_slug = None
     sorting = None
+    search = None
+    cursor = None
+    sorting_keys = {
+        "created": "created",
+        "avg_score": "stats__average_score",
+        "length": "question_count",
+        "likes": "likes",
+    }
 
     def dispatch(self, request, *args, **kwargs):
         self.author_username = self.request.GET.get("author", "")
         self.category_slug = self.request.GET.get("category", "")
         self.sorting = self.request.GET.get("sorting", "")
+        self.search = self.request.GET.get("search", "")
+        self.cursor = self.request.GET.get("cursor", None)
 
         return super().dispatch(request, *args, **kwargs)
 
@@ -240,16 +278,25 @@ class QuizzesListView(ListView):
             qs = qs.filter(author__username=self.author_username)
         if self.category_slug and self.category_slug != "any":
             qs = qs.filter(category__slug=self.category_slug)
+        if self.search:
+            qs = self.search_queryset(qs)
         if self.sorting:
             qs = self.sort_queryset(qs)
         return qs
 
+    def search_queryset(self, qs):
+        ids = get_search_backend().search(self.search)
+        if not ids:
+            return qs.none()
+
+        qs = qs.filter(pk__in=ids)
+        if not self.sorting:
+            rank = Case(*[When(pk=pk, then=i) for i, pk in enumerate(ids)])
+            qs = qs.order_by(rank)
+        return qs
+
     def sort_queryset(self, qs):
-        asc = True
-        sorting = self.sorting
-        if self.sorting.startswith("-"):
-            sorting = self.sorting[1:]
-            asc = False
+        sorting, asc = self.get_sorting_and_order()
 
         if sorting == "created":
             qs = qs.sort_by_date_created(asc)
@@ -262,23 +309,165 @@ class QuizzesListView(ListView):
 
         return qs
 
+    def get_sorting_and_order(self):
+        if self.sorting.startswith("-"):
+            return self.sorting[1:], False
+        return self.sorting, True
+
+    def is_cursor_pagination(self):
+        # Ranked search results are ordered by their rank, which a cursor does
+        # not hold. They are limited to SEARCH_RESULTS_LIMIT, so their offsets
+        # stay small.
+        is_ranked_search = self.search and not self.sorting
+        return self.cursor is not None and not is_ranked_search
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.is_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        sorting, asc = self.get_sorting_and_order()
+        key = self.sorting_keys.get(sorting, "pk")
+        paginator = CursorPaginator(queryset, page_size, key=key, asc=asc)
+        try:
+            page = paginator.page(self.cursor)
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        is_paginated = page.has_next() or page.has_previous()
+        return paginator, page, page.object_list, is_paginated
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
         context["author_username"] = self.author_username
         context["category_slug"] = self.category_slug
         context["sorting"] = self.sorting
+        context["search"] = self.search
+        context["cursor_pagination"] = self.is_cursor_pagination()
         context["sort_filter_form"] = FilterSortQuizzesForm(self.request.GET)
 
         return context
 
 
+class ScoreHistoryMixin(LoginRequiredMixin):
+    paginate_by = 20
+    cursor_key = "pk"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, key=self.cursor_key, asc=False)
+        try:
+            page = paginator.page(self.request.GET.get("cursor", ""))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        is_paginated = page.has_next() or page.has_previous()
+        return paginator, page, page.object_list, is_paginated
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get("format") == "json":
+            return JsonResponse(
+                {
+                    **self.get_json_data(context),
+                    "next_cursor": context["page_obj"].next_cursor,
+                }
+            )
+        return super().render_to_response(context, **response_kwargs)
+
+    @staticmethod
+    def get_personal_best_data(personal_best):
+        return {
+            "attempts": personal_best.attempts,
+            "best_percentage": personal_best.best_percentage,
+            "last_percentage": personal_best.last_percentage,
+            "last_attempted": personal_best.last_attempted,
+        }
+
+
+class ScoreHistoryView(ScoreHistoryMixin, ListView):
+    template_name = "quizzes/score/history.html"
+    context_object_name = "personal_bests"
+    cursor_key = "last_attempted"
+
+    def get_queryset(self):
+        return PersonalBest.objects.filter(user=self.request.user).select_related(
+            "quiz"
+        )
+
+    def get_json_data(self, context):
+        return {
+            "results": [
+                {
+                    "quiz": {
+                        "title": personal_best.quiz.title,
+                        "slug": personal_best.quiz.slug,
+                        "url": personal_best.quiz.get_absolute_url(),
+                    },
+                    **self.get_personal_best_data(personal_best),
+                }
+                for personal_best in context["personal_bests"]
+            ]
+        }
+
+
+class QuizScoreHistoryView(ScoreHistoryMixin, ListView):
+    template_name = "quizzes/score/quiz_history.html"
+    context_object_name = "scores"
+
+    def get(self, request, *args, **kwargs):
+        self.quiz = get_object_or_404(Quiz, slug=kwargs["slug"])
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return self.request.user.scores.filter(quiz=self.quiz).only("pk", "percentage")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["quiz"] = self.quiz
+        context["personal_best"] = PersonalBest.objects.filter(
+            user=self.request.user, quiz=self.quiz
+        ).first()
+        return context
+
+    def get_json_data(self, context):
+        personal_best = context["personal_best"]
+        return {
+            "quiz": {"title": self.quiz.title, "slug": self.quiz.slug},
+            "personal_best": personal_best
+            and self.get_personal_best_data(personal_best),
+            "results": [
+                {"id": score.pk, "percentage": score.percentage}
+                for score in context["scores"]
+            ],
+        }
+
+
 class QuizDetailView(DetailView):
     model = Quiz
     template_name = "quizzes/quiz/detail.html"
     context_object_name = "quiz"
 
     def get_queryset(self):
-        return self.model.objects.select_related("author__profile", "category")
+        return self.model.objects.select_related("author__profile", "category", "stats")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["leaderboard"] = self.object.get_leaderboard()
+        return context
+
+
+def leaderboard_view(request, slug):
+    quiz = get_object_or_404(Quiz, slug=slug)
+    return JsonResponse(
+        {
+            "quiz": {"title": quiz.title, "slug": quiz.slug},
+            "leaderboard": [
+                {
+                    "rank": rank,
+                    "username": personal_best.user.username,
+                    "best_percentage": personal_best.best_percentage,
+                    "attempts": personal_best.attempts,
+                }
+                for rank, personal_best in quiz.get_leaderboard()
+            ],
+        }
+    )
 
 
 def like_quiz_view(request, slug):
@@ -295,8 +484,27 @@ class HomePageView(TemplateView):
     template_name = "quizzes/home.html"
 
     def get_context_data(self):
-        quizzes = Quiz.objects.order_by("-likes")[:3]
-        if quizzes.count() == 3:
-            return {"quizzes": Quiz.objects.order_by("-likes")[:3]}
-        else:
-            return {"quizzes": []}
+        return {"quizzes": Quiz.get_top_quizzes()}
+
+
+def run_in_thread(view):
+    # Django runs all synchronous code of an ASGI app in a single thread, so the
+    # async views run the ORM in threads of their own to serve requests
+    # concurrently.
+    def run_view(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        finally:
+            connection.close()
+
+    return sync_to_async(run_view, thread_sensitive=False)
+
+
+async def take_quiz_async_view(request, slug):
+    return await run_in_thread(BackgroundScoreTakeQuizView.as_view())(
+        request, slug=slug
+    )
+
+
+async def like_quiz_async_view(request, slug):
+    return await run_in_thread(like_quiz_view)(request, slug)